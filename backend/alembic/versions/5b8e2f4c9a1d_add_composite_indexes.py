@@ -0,0 +1,31 @@
+"""Add composite indexes for hot lookups
+
+Revision ID: 5b8e2f4c9a1d
+Revises: 0d97cf92c21a
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2f4c9a1d'
+down_revision: Union[str, None] = '0d97cf92c21a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_project_status_deadline', 'projects', ['status', 'deadline'], unique=False)
+    op.create_index('ix_bid_project_bidder', 'bids', ['project_id', 'bidder_id'], unique=True)
+    op.create_index('ix_bid_bidder_created', 'bids', ['bidder_id', 'created_at'], unique=False)
+    op.create_index('ix_document_bid', 'documents', ['bid_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_document_bid', table_name='documents')
+    op.drop_index('ix_bid_bidder_created', table_name='bids')
+    op.drop_index('ix_bid_project_bidder', table_name='bids')
+    op.drop_index('ix_project_status_deadline', table_name='projects')
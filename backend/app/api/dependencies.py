@@ -4,7 +4,7 @@ from jose import JWTError, jwt
 from app.core.config import settings
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import get_db
-from app.db.models import User
+from app.db.models import User, UserRole
 from sqlalchemy import select
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
@@ -34,3 +34,17 @@ async def get_current_user(
         raise credentials_exception
 
     return user
+
+
+def require_role(role: UserRole):
+    """Build a dependency that only admits users with the given role"""
+
+    async def role_checker(current_user: User = Depends(get_current_user)):
+        if current_user.role != role:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Only {role.value}s can access this endpoint",
+            )
+        return current_user
+
+    return role_checker
@@ -1,43 +1,105 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-from typing import List
+from sqlalchemy import select, and_, exists, func, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import joinedload, load_only, raiseload
+from typing import List, Optional, Tuple
 from datetime import datetime
+import hashlib
 import os
 
+import aiofiles.tempfile
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+
 from app.db.database import get_db
 from app.db import models
 from app.api.schemas import bidder as schemas
-from app.api.dependencies import get_current_user
-from app.services.document_processor import DocumentProcessor
+from app.api.dependencies import get_current_user, require_role
+from app.core.cache import active_projects_cache_key, redis_client
+from app.core.config import settings
+from app.services.document_processor import (
+    DocumentExtractionError,
+    DocumentSource,
+    get_document_processor
+)
 from app.services.storage_service import StorageService
 
 router = APIRouter()
-doc_processor = DocumentProcessor()
+# Current UTC time evaluated by the database; deadlines are naive UTC
+DB_UTC_NOW = func.timezone("utc", func.now())
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Uploads larger than this are spooled to disk instead of held in memory
+UPLOAD_SPOOL_SIZE = 8 * 1024 * 1024
+doc_processor = get_document_processor()
 storage_service = StorageService()
+active_projects_adapter = TypeAdapter(List[schemas.ProjectListResponse])
 
 @router.get("/projects", response_model=List[schemas.ProjectListResponse])
 async def get_active_projects(
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(require_role(models.UserRole.BIDDER)),
+    limit: int = Query(50, ge=1, le=200),
+    after_deadline: Optional[datetime] = None,
+    after_id: Optional[int] = None
 ):
-    """Get all active projects available for bidding"""
+    """
+    Get active projects available for bidding, soonest deadline first
+    
+    Keyset paginated: pass the deadline and id of the last project of the
+    previous page as after_deadline/after_id to get the next page.
+    """
     
-    if current_user.role != models.UserRole.BIDDER:
+    if (after_deadline is None) != (after_id is None):
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only bidders can access this endpoint"
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="after_deadline and after_id must be given together"
         )
     
-    result = await db.execute(
+    # The first page is what every bidder dashboard polls; serve it from
+    # Redis while it is fresh
+    first_page = after_deadline is None
+    cache_key = active_projects_cache_key(limit)
+    if first_page:
+        try:
+            cached = await redis_client.get(cache_key)
+        except RedisError:
+            cached = None
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+    
+    query = (
         select(models.Project)
+        .options(raiseload("*"))
         .where(models.Project.status == models.ProjectStatus.ACTIVE)
-        .where(models.Project.deadline > datetime.utcnow())
-        .order_by(models.Project.deadline.asc())
+        .where(models.Project.deadline > DB_UTC_NOW)
+    )
+    
+    if not first_page:
+        query = query.where(
+            tuple_(models.Project.deadline, models.Project.id)
+            > tuple_(after_deadline, after_id)
+        )
+    
+    result = await db.execute(
+        query
+        .order_by(models.Project.deadline.asc(), models.Project.id.asc())
+        .limit(limit)
     )
     projects = result.scalars().all()
     
-    return projects
+    if not first_page:
+        return projects
+    
+    content = active_projects_adapter.dump_json(
+        active_projects_adapter.validate_python(projects, from_attributes=True)
+    )
+    try:
+        await redis_client.setex(cache_key, settings.ACTIVE_PROJECTS_CACHE_TTL, content)
+    except RedisError:
+        pass
+    
+    return Response(content=content, media_type="application/json")
 
 @router.get("/projects/{project_id}", response_model=schemas.ProjectDetailResponse)
 async def get_project_detail(
@@ -47,11 +109,14 @@ async def get_project_detail(
 ):
     """Get detailed project information"""
     
+    # Join the organization in the same round trip; lazy-loading it later
+    # would cost a second SELECT (and fails outright under AsyncSession)
     result = await db.execute(
         select(models.Project)
+        .options(joinedload(models.Project.organization))
         .where(models.Project.id == project_id)
     )
-    project = result.scalar_one_or_none()
+    project = result.unique().scalar_one_or_none()
     
     if not project:
         raise HTTPException(
@@ -82,72 +147,64 @@ async def get_project_detail(
 async def create_bid(
     bid: schemas.BidCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(require_role(models.UserRole.BIDDER))
 ):
     """Create a new bid for a project"""
     
-    if current_user.role != models.UserRole.BIDDER:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only bidders can create bids"
-        )
-    
-    # Verify project exists and is active
+    # Verify project exists and is active; only the two predicates are
+    # evaluated in SQL, no Project row is loaded
     project_result = await db.execute(
-        select(models.Project)
+        select(
+            models.Project.status == models.ProjectStatus.ACTIVE,
+            models.Project.deadline > DB_UTC_NOW
+        )
         .where(models.Project.id == bid.project_id)
     )
-    project = project_result.scalar_one_or_none()
+    project_state = project_result.one_or_none()
     
-    if not project:
+    if not project_state:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
     
-    if project.status != models.ProjectStatus.ACTIVE:
+    is_active, before_deadline = project_state
+    
+    if not is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Project is not accepting bids"
         )
     
-    if project.deadline < datetime.utcnow():
+    if not before_deadline:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Project deadline has passed"
         )
     
-    # Check for existing bid
-    existing_result = await db.execute(
-        select(models.Bid)
-        .where(
-            and_(
-                models.Bid.project_id == bid.project_id,
-                models.Bid.bidder_id == current_user.id
-            )
+    # Create bid; the unique (project_id, bidder_id) index rejects a second
+    # bid atomically, so no separate existence check is needed
+    db_bid = await db.scalar(
+        pg_insert(models.Bid)
+        .values(
+            project_id=bid.project_id,
+            bidder_id=current_user.id,
+            bid_amount=bid.bid_amount,
+            currency=bid.currency,
+            cover_letter=bid.cover_letter,
+            status=models.BidStatus.DRAFT
         )
+        .on_conflict_do_nothing(index_elements=["project_id", "bidder_id"])
+        .returning(models.Bid)
     )
-    existing_bid = existing_result.scalar_one_or_none()
     
-    if existing_bid:
+    if db_bid is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You have already submitted a bid for this project"
         )
     
-    # Create bid
-    db_bid = models.Bid(
-        project_id=bid.project_id,
-        bidder_id=current_user.id,
-        bid_amount=bid.bid_amount,
-        currency=bid.currency,
-        cover_letter=bid.cover_letter,
-        status=models.BidStatus.DRAFT
-    )
-    
-    db.add(db_bid)
     await db.commit()
-    await db.refresh(db_bid)
     
     return db_bid
 
@@ -193,24 +250,49 @@ async def upload_bid_document(
         )
     
     file_ext = os.path.splitext(file.filename)[1].lower()
-    from app.core.config import settings
     if file_ext not in settings.ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"File type {file_ext} not allowed"
         )
     
-    # Upload to storage
-    file_path = await storage_service.upload_file(
-        file,
-        f"bids/{bid_id}/{document_type.value}/{file.filename}"
-    )
-    
-    # Process document (extract text)
-    file_content = await file.read()
-    await file.seek(0)  # Reset file pointer
-    
-    extracted_text = await doc_processor.extract_text(file_content, file_ext)
+    source, file_size, content_hash = await _spool_upload(file, file_ext)
+    try:
+        await file.seek(0)  # Reset file pointer for storage
+        
+        # Upload to storage
+        file_path = await storage_service.upload_file(
+            file,
+            f"bids/{bid_id}/{document_type.value}/{file.filename}"
+        )
+        
+        # Process document (extract text), reusing the result for identical
+        # files uploaded before
+        cache_key = f"cache:doctext:{content_hash}"
+        try:
+            extracted_text = await redis_client.get(cache_key)
+        except RedisError:
+            extracted_text = None
+        
+        if extracted_text is None:
+            try:
+                extracted_text = await doc_processor.extract_text(source, file_ext)
+            except DocumentExtractionError as e:
+                # Kept on the document, but not cached: the failure may be
+                # transient and a re-upload should parse the file again
+                extracted_text = str(e)
+            else:
+                try:
+                    await redis_client.setex(
+                        cache_key,
+                        settings.DOC_TEXT_CACHE_TTL,
+                        extracted_text[:10000]
+                    )
+                except RedisError:
+                    pass
+    finally:
+        if isinstance(source, str):
+            os.unlink(source)
     
     # Create document record
     document = models.Document(
@@ -218,15 +300,14 @@ async def upload_bid_document(
         document_type=document_type,
         filename=file.filename,
         file_path=file_path,
-        file_size=file.size,
+        file_size=file_size,
         mime_type=file.content_type,
         extracted_text=extracted_text[:10000],  # Store first 10k chars
-        metadata={}
+        document_metadata={"sha256": content_hash}
     )
     
     db.add(document)
     await db.commit()
-    await db.refresh(document)
     
     return {
         "message": "Document uploaded successfully",
@@ -234,6 +315,50 @@ async def upload_bid_document(
         "filename": document.filename
     }
 
+async def _spool_upload(file: UploadFile, suffix: str) -> Tuple[DocumentSource, int, str]:
+    """
+    Read an upload once in fixed-size chunks, fingerprinting the content and
+    rejecting oversized files before they are fully read
+    
+    Returns (source, size, sha256 hex digest). The source is the content itself
+    for files up to UPLOAD_SPOOL_SIZE; larger files are written to a temporary
+    file whose path is returned instead, and which the caller must remove.
+    """
+    digest = hashlib.sha256()
+    chunks = []
+    file_size = 0
+    spool = None
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            file_size += len(chunk)
+            if file_size > settings.MAX_UPLOAD_SIZE:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="File exceeds maximum upload size"
+                )
+            digest.update(chunk)
+            
+            if spool is None and file_size > UPLOAD_SPOOL_SIZE:
+                spool = await aiofiles.tempfile.NamedTemporaryFile("wb", suffix=suffix, delete=False)
+                await spool.write(b"".join(chunks))
+                chunks = []
+            
+            if spool is not None:
+                await spool.write(chunk)
+            else:
+                chunks.append(chunk)
+    except BaseException:
+        if spool is not None:
+            await spool.close()
+            os.unlink(spool.name)
+        raise
+    
+    if spool is None:
+        return b"".join(chunks), file_size, digest.hexdigest()
+    
+    await spool.close()
+    return spool.name, file_size, digest.hexdigest()
+
 @router.post("/bids/{bid_id}/submit")
 async def submit_bid(
     bid_id: int,
@@ -242,9 +367,10 @@ async def submit_bid(
 ):
     """Submit a bid for evaluation"""
     
-    # Verify bid ownership
+    # Verify bid ownership and check for uploaded documents in one query
+    documents_exist = exists().where(models.Document.bid_id == models.Bid.id)
     bid_result = await db.execute(
-        select(models.Bid)
+        select(models.Bid, documents_exist)
         .where(
             and_(
                 models.Bid.id == bid_id,
@@ -252,14 +378,16 @@ async def submit_bid(
             )
         )
     )
-    bid = bid_result.scalar_one_or_none()
+    row = bid_result.one_or_none()
     
-    if not bid:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Bid not found"
         )
     
+    bid, has_document = row
+    
     if bid.status == models.BidStatus.SUBMITTED:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -267,13 +395,7 @@ async def submit_bid(
         )
     
     # Check if required documents are uploaded
-    docs_result = await db.execute(
-        select(models.Document)
-        .where(models.Document.bid_id == bid_id)
-    )
-    documents = docs_result.scalars().all()
-    
-    if len(documents) == 0:
+    if not has_document:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Please upload at least one document before submitting"
@@ -283,10 +405,14 @@ async def submit_bid(
     bid.status = models.BidStatus.SUBMITTED
     bid.submitted_at = datetime.utcnow()
     
-    await db.commit()
+    # Record the evaluation request in the same transaction; the outbox
+    # relay hands it to the evaluation queue
+    db.add(models.OutboxEvent(
+        event_type="bid.submitted",
+        payload={"bid_id": bid_id}
+    ))
     
-    # TODO: Trigger AI evaluation (add to queue)
-    # await evaluation_service.queue_evaluation(bid_id)
+    await db.commit()
     
     return {
         "message": "Bid submitted successfully",
@@ -297,14 +423,29 @@ async def submit_bid(
 @router.get("/my-bids", response_model=List[schemas.BidResponse])
 async def get_my_bids(
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0)
 ):
-    """Get all bids submitted by the current bidder"""
+    """Get bids submitted by the current bidder, newest first"""
     
     result = await db.execute(
         select(models.Bid)
+        .options(
+            load_only(
+                models.Bid.id,
+                models.Bid.bid_amount,
+                models.Bid.currency,
+                models.Bid.status,
+                models.Bid.submitted_at,
+                raiseload=True
+            ),
+            raiseload("*")
+        )
         .where(models.Bid.bidder_id == current_user.id)
         .order_by(models.Bid.created_at.desc())
+        .limit(limit)
+        .offset(offset)
     )
     bids = result.scalars().all()
     
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
+from sqlalchemy.orm import contains_eager, joinedload, load_only, raiseload
 from typing import List
 from datetime import datetime
 
 from app.db.database import get_db
 from app.db import models
 from app.api.schemas import organization as schemas
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user, require_role
+from app.core.cache import invalidate_active_projects
 
 router = APIRouter()
 
@@ -15,16 +17,10 @@ router = APIRouter()
 async def create_project(
     project: schemas.ProjectCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(require_role(models.UserRole.ORGANIZATION))
 ):
     """Create a new project/tender (Organization only)"""
     
-    if current_user.role != models.UserRole.ORGANIZATION:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only organizations can create projects"
-        )
-    
     # Generate tender reference
     tender_ref = f"TND-{datetime.utcnow().strftime('%Y%m%d')}-{current_user.id}"
     
@@ -42,25 +38,30 @@ async def create_project(
     
     db.add(db_project)
     await db.commit()
-    await db.refresh(db_project)
     
     return db_project
 
 @router.get("/projects", response_model=List[schemas.ProjectResponse])
 async def get_my_projects(
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: models.User = Depends(require_role(models.UserRole.ORGANIZATION)),
     status_filter: str = None
 ):
     """Get all projects for the current organization"""
     
-    if current_user.role != models.UserRole.ORGANIZATION:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only organizations can access this endpoint"
-        )
-    
-    query = select(models.Project).where(
+    # Load only the columns ProjectResponse serializes; anything else
+    # fails loudly instead of lazy-loading
+    query = select(models.Project).options(
+        load_only(
+            models.Project.id,
+            models.Project.title,
+            models.Project.description,
+            models.Project.tender_reference,
+            models.Project.deadline,
+            raiseload=True
+        ),
+        raiseload("*")
+    ).where(
         models.Project.organization_id == current_user.id
     )
     
@@ -78,16 +79,10 @@ async def get_my_projects(
 async def get_project_detail(
     project_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: models.User = Depends(require_role(models.UserRole.ORGANIZATION))
 ):
     """Get detailed project information including bids"""
     
-    if current_user.role != models.UserRole.ORGANIZATION:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only organizations can access this endpoint"
-        )
-    
     result = await db.execute(
         select(models.Project)
         .where(
@@ -152,7 +147,7 @@ async def update_project(
     project.updated_at = datetime.utcnow()
     
     await db.commit()
-    await db.refresh(project)
+    await invalidate_active_projects()
     
     return project
 
@@ -185,6 +180,7 @@ async def publish_project(
     project.updated_at = datetime.utcnow()
     
     await db.commit()
+    await invalidate_active_projects()
     
     return {"message": "Project published successfully", "project_id": project_id}
 
@@ -214,21 +210,23 @@ async def get_project_evaluations(
             detail="Project not found"
         )
     
-    # Get all bids with evaluations
+    # Get all bids with their evaluation and bidder in a single query,
+    # highest scoring first
     bids_result = await db.execute(
         select(models.Bid)
+        .outerjoin(models.Bid.evaluation)
+        .options(
+            contains_eager(models.Bid.evaluation),
+            joinedload(models.Bid.bidder)
+        )
         .where(models.Bid.project_id == project_id)
-        .order_by(models.Bid.submitted_at.desc())
+        .order_by(models.Evaluation.overall_score.desc().nullslast())
     )
-    bids = bids_result.scalars().all()
+    bids = bids_result.unique().scalars().all()
     
     evaluations_data = []
     for bid in bids:
-        eval_result = await db.execute(
-            select(models.Evaluation)
-            .where(models.Evaluation.bid_id == bid.id)
-        )
-        evaluation = eval_result.scalar_one_or_none()
+        evaluation = bid.evaluation
         
         if evaluation:
             evaluations_data.append({
@@ -243,9 +241,6 @@ async def get_project_evaluations(
                 "ai_analysis": evaluation.ai_analysis
             })
     
-    # Sort by overall score
-    evaluations_data.sort(key=lambda x: x["overall_score"], reverse=True)
-    
     return {
         "project_id": project_id,
         "project_title": project.title,
@@ -305,6 +300,7 @@ async def award_contract(
     project.status = models.ProjectStatus.AWARDED
     
     await db.commit()
+    await invalidate_active_projects()
     
     return {
         "message": "Contract awarded successfully",
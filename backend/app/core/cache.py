@@ -0,0 +1,33 @@
+import logging
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Shared Redis client; connections are opened lazily from its pool
+redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+# Serialized first pages of the bidder project listing, one key per page
+# size so each expires on its own TTL
+ACTIVE_PROJECTS_CACHE_PREFIX = "active_projects:v1"
+
+
+def active_projects_cache_key(limit: int) -> str:
+    """Cache key of the first active projects page of the given size"""
+    return f"{ACTIVE_PROJECTS_CACHE_PREFIX}:{limit}"
+
+
+async def invalidate_active_projects():
+    """Drop every cached page of the active project listing"""
+    try:
+        keys = [
+            key
+            async for key in redis_client.scan_iter(match=f"{ACTIVE_PROJECTS_CACHE_PREFIX}:*")
+        ]
+        if keys:
+            await redis_client.delete(*keys)
+    except RedisError as e:
+        logger.warning(f"Failed to invalidate active projects cache: {str(e)}")
@@ -1,21 +1,44 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
 
 # Convert PostgreSQL URL to async
 DATABASE_URL = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
 
+def make_engine(for_script: bool = False) -> AsyncEngine:
+    """
+    Create an async engine
+    
+    Scripts get no pool, so their few connections close as soon as they are
+    released; the server keeps a pool sized by settings.
+    """
+    if for_script:
+        return create_async_engine(
+            DATABASE_URL,
+            echo=settings.SQL_ECHO,
+            poolclass=NullPool
+        )
+    
+    return create_async_engine(
+        DATABASE_URL,
+        echo=settings.SQL_ECHO,
+        future=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        # Reuse the most recently returned connection so idle ones can
+        # time out and hot ones stay warm
+        pool_use_lifo=True
+    )
+
 # Create async engine
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True
-)
+engine = make_engine()
 
 # Create session factory
-AsyncSessionLocal = sessionmaker(
+AsyncSessionLocal = async_sessionmaker(
     engine,
-    class_=AsyncSession,
     expire_on_commit=False
 )
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, ForeignKey, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -81,6 +81,11 @@ class Project(Base):
     # Relationships
     organization = relationship("User", back_populates="projects")
     bids = relationship("Bid", back_populates="project", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Active project listing: status filter + deadline range/sort
+        Index("ix_project_status_deadline", "status", "deadline"),
+    )
 
 class Bid(Base):
     __tablename__ = "bids"
@@ -107,6 +112,13 @@ class Bid(Base):
     bidder = relationship("User", back_populates="bids")
     documents = relationship("Document", back_populates="bid", cascade="all, delete-orphan")
     evaluation = relationship("Evaluation", back_populates="bid", uselist=False)
+    
+    __table_args__ = (
+        # One bid per bidder per project
+        Index("ix_bid_project_bidder", "project_id", "bidder_id", unique=True),
+        # "My bids" listing, newest first
+        Index("ix_bid_bidder_created", "bidder_id", "created_at"),
+    )
 
 class Document(Base):
     __tablename__ = "documents"
@@ -128,6 +140,10 @@ class Document(Base):
     
     # Relationships
     bid = relationship("Bid", back_populates="documents")
+    
+    __table_args__ = (
+        Index("ix_document_bid", "bid_id"),
+    )
 
 class Evaluation(Base):
     __tablename__ = "evaluations"
@@ -167,4 +183,23 @@ class Evaluation(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    bid = relationship("Bid", back_populates="evaluation")
\ No newline at end of file
+    bid = relationship("Bid", back_populates="evaluation")
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String, nullable=False)  # e.g. "bid.submitted"
+    payload = Column(JSON, nullable=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime)
+    
+    __table_args__ = (
+        # Relay scans only events that have not been dispatched yet
+        Index(
+            "ix_outbox_unprocessed",
+            "id",
+            postgresql_where=processed_at.is_(None)
+        ),
+    )
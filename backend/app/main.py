@@ -1,12 +1,15 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 from app.api.routes import organization, bidder, evaluation, auth
 from app.core.config import settings
 from app.db.database import engine, Base
 from app.db import models
+from app.services.ai_evaluator import get_evaluator
+from app.services.document_processor import get_document_processor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -24,10 +27,18 @@ async def lifespan(app: FastAPI):
     
     logger.info("Database tables created successfully")
     
+    # Build the shared Gemini client up front so the first evaluation
+    # does not pay for channel setup
+    if settings.GOOGLE_API_KEY:
+        await get_evaluator().warm_up()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down E-Tendering Platform API...")
+    
+    # Stop the document parsing worker processes
+    await asyncio.to_thread(get_document_processor().shutdown)
 
 # Create FastAPI app
 app = FastAPI(
@@ -1,126 +1,330 @@
+import argparse
 import asyncio
-from datetime import datetime, timedelta
-from app.db.database import AsyncSessionLocal
+import enum
+import orjson
+from sqlalchemy import JSON, String, cast, insert, literal, literal_column, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.database import make_engine
 from app.db.models import (
     User, UserRole,
     Project, ProjectStatus,
     Bid, BidStatus,
     Document, DocumentType,
-    Evaluation
+    Evaluation,
 )
+from datetime import datetime, timedelta
 
-async def create_test_data():
-    async with AsyncSessionLocal() as session:
-        # ----------------------------
-        # Create Users
-        # ----------------------------
-        org_user = User(
-            email="organization@example.com",
-            hashed_password="hashedpassword",
-            role=UserRole.ORGANIZATION,
-            full_name="Test Organization",
-            company_name="Test Org Ltd",
-            phone="1234567890"
-        )
+try:
+    # Installed with uvicorn[standard]; not available on Windows
+    import uvloop
+except ImportError:
+    uvloop = None
 
-        bidder_user = User(
-            email="bidder@example.com",
-            hashed_password="hashedpassword",
-            role=UserRole.BIDDER,
-            full_name="Test Bidder",
-            phone="0987654321"
-        )
+# Rows per multi-row INSERT statement; a page stays well below PostgreSQL's
+# limit of 32767 bind parameters per statement
+SEED_PAGE_SIZE = 1000
 
-        session.add_all([org_user, bidder_user])
-        await session.commit()
-
-        print("✅ Users created")
-
-        # ----------------------------
-        # Create Projects
-        # ----------------------------
-        project1 = Project(
-            organization_id=org_user.id,
-            title="New Office Building Construction",
-            description="Construction of a new office building in downtown.",
-            tender_reference="REF-001",
-            deadline=datetime.utcnow() + timedelta(days=30),
-            status=ProjectStatus.ACTIVE,
-            evaluation_criteria={
-                "technical_weight": 60,
-                "financial_weight": 40,
-                "minimum_experience_years": 5
-            },
-            budget_range_min=100000,
-            budget_range_max=500000
-        )
+# Above this many rows, tables nothing references back are loaded with COPY
+COPY_MIN_ROWS = 1000
 
-        session.add(project1)
-        await session.commit()
-        print("✅ Project created")
-
-        # ----------------------------
-        # Create Bids
-        # ----------------------------
-        bid1 = Bid(
-            project_id=project1.id,
-            bidder_id=bidder_user.id,
-            status=BidStatus.SUBMITTED,
-            bid_amount=450000,
-            currency="USD",
-            cover_letter="We are the best choice for this project.",
-            submitted_at=datetime.utcnow()
-        )
+# Every generated project shares these criteria; serialize them once instead
+# of once per row through the JSON column type
+EVALUATION_CRITERIA_JSON = orjson.dumps(
+    {"technical_weight": 60, "financial_weight": 40, "minimum_experience_years": 5}
+).decode()
 
-        session.add(bid1)
-        await session.commit()
-        print("✅ Bid created")
-
-        # ----------------------------
-        # Create Documents
-        # ----------------------------
-        doc1 = Document(
-            bid_id=bid1.id,
-            document_type=DocumentType.RFP,
-            filename="rfp_document.pdf",
-            file_path="documents/rfp_document.pdf",
-            file_size=204800,
-            mime_type="application/pdf",
-            extracted_text="Sample extracted text",
-            metadata={"pages": 10}
-        )
 
-        session.add(doc1)
-        await session.commit()
-        print("✅ Document created")
-
-        # ----------------------------
-        # Create Evaluation
-        # ----------------------------
-        evaluation1 = Evaluation(
-            bid_id=bid1.id,
-            technical_score=55.0,
-            financial_score=38.0,
-            compliance_score=5.0,
-            overall_score=98.0,
-            ai_analysis={
-                "strengths": ["Good technical approach"],
-                "weaknesses": ["Budget slightly high"],
-                "compliance_status": "pass",
-                "recommendations": "Proceed with caution"
-            },
-            is_qualified=1,
-            is_shortlisted=1,
-            rank=1,
-            reviewer_notes="Reviewed by admin",
-            reviewed_by=org_user.id,
-            reviewed_at=datetime.utcnow()
+def _upsert(model, *index_elements: str):
+    """
+    INSERT that leaves a conflicting row as it is but still returns it, so
+    re-running the seed reuses existing rows instead of failing
+    """
+    statement = pg_insert(model)
+    key = index_elements[0]
+    return statement.on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_={key: statement.excluded[key]},
+    )
+
+
+def _copy_value(value):
+    """Convert a row value to what asyncpg's COPY encoder expects"""
+    if isinstance(value, enum.Enum):
+        return value.name  # SQLAlchemy stores enum names
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode()
+    return value
+
+
+async def bulk_copy(session: AsyncSession, model, rows: list):
+    """
+    Load rows with PostgreSQL COPY on the session's asyncpg connection
+
+    COPY avoids per-row statement overhead but returns nothing, checks no
+    conflicts and applies no Python-side column defaults, so every row must
+    carry all the columns it needs.
+    """
+    columns = list(rows[0])
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        model.__tablename__,
+        records=[tuple(_copy_value(row[column]) for column in columns) for row in rows],
+        columns=columns,
+    )
+
+
+def _secondary_indexes() -> list:
+    """Non-unique indexes of the seeded tables; the unique ones back ON CONFLICT"""
+    return [
+        index
+        for model in (User, Project, Bid, Document, Evaluation)
+        for index in model.__table__.indexes
+        if not index.unique
+    ]
+
+
+async def seed(
+    session: AsyncSession,
+    n_orgs: int = 1,
+    n_bidders: int = 1,
+    n_projects_per_org: int = 1,
+    n_bids_per_project: int = 1,
+    bulk_mode: bool = False,
+):
+    """
+    Insert generated test data with bulk INSERTs, one per table and page
+
+    Every bid gets one document and one evaluation. A bidder bids at most
+    once per project, so n_bids_per_project may not exceed n_bidders.
+    Rows that already exist are kept, so seeding again is a no-op.
+
+    In bulk mode the non-unique indexes are dropped for the load and built
+    once at the end, which is cheaper than maintaining them row by row.
+    """
+    if n_bids_per_project > n_bidders:
+        raise ValueError("n_bids_per_project cannot exceed n_bidders")
+
+    # Seed data is disposable: let the final commit return without waiting
+    # for the WAL flush. LOCAL ends with this transaction.
+    await session.execute(text("SET LOCAL synchronous_commit = OFF"))
+
+    # DDL is transactional in PostgreSQL: a failed seed restores the indexes
+    indexes = _secondary_indexes() if bulk_mode else []
+    connection = await session.connection()
+    for index in indexes:
+        await connection.run_sync(index.drop, checkfirst=True)
+
+    # Core INSERTs with parameter lists skip the ORM unit of work; each
+    # parent insert returns the ids its children reference. Rows that
+    # already exist keep their old ids, so ids are matched to rows by
+    # natural key rather than by position.
+    execution_options = {"insertmanyvalues_page_size": SEED_PAGE_SIZE}
+    # One timestamp for every generated row (naive UTC, like the columns)
+    now = datetime.utcnow()
+
+    # ---- Create organization and bidder users ----
+    users = [
+        {
+            "email": f"org{number}@example.com",
+            "hashed_password": "fakehashed",
+            "role": UserRole.ORGANIZATION,
+            "full_name": f"Test Organization {number}",
+            "company_name": f"Org Company {number}",
+            "phone": "123456789",
+        }
+        for number in range(1, n_orgs + 1)
+    ] + [
+        {
+            "email": f"bidder{number}@example.com",
+            "hashed_password": "fakehashed",
+            "role": UserRole.BIDDER,
+            "full_name": f"Test Bidder {number}",
+            "company_name": f"Bidder Company {number}",
+            "phone": "987654321",
+        }
+        for number in range(1, n_bidders + 1)
+    ]
+    result = await session.execute(
+        _upsert(User, "email").returning(User.email, User.id),
+        users,
+        execution_options=execution_options,
+    )
+    user_ids = dict(result.all())
+    org_ids = [user_ids[user["email"]] for user in users[:n_orgs]]
+    bidder_ids = [user_ids[user["email"]] for user in users[n_orgs:]]
+
+    # ---- Create projects ----
+    projects = [
+        {
+            "organization_id": org_id,
+            "title": f"Sample Project {number}",
+            "description": "This is a test project.",
+            "tender_reference": f"RFQ-{number:03d}",
+            # Open for bids, closing over the following month
+            "deadline": now + timedelta(days=30 + number % 30),
+            "status": ProjectStatus.ACTIVE,
+            "budget_range_min": 100000.0,
+            "budget_range_max": 500000.0,
+        }
+        for number, org_id in enumerate(
+            (org_id for org_id in org_ids for _ in range(n_projects_per_org)), 1
         )
+    ]
+    result = await session.execute(
+        _upsert(Project, "tender_reference")
+        .values(evaluation_criteria=cast(literal(EVALUATION_CRITERIA_JSON, String), JSON))
+        .returning(Project.tender_reference, Project.id, Project.organization_id),
+        projects,
+        execution_options=execution_options,
+    )
+    # Existing projects keep the organization they were created with, which
+    # need not be the one generated for their reference in this run
+    project_rows = {reference: (project_id, org_id) for reference, project_id, org_id in result.all()}
+    project_ids = [project_rows[project["tender_reference"]][0] for project in projects]
+    project_orgs = dict(project_rows.values())
+
+    # ---- Create bids ----
+    # Rotate through the bidders so each project gets distinct ones
+    bids = [
+        {
+            "project_id": project_id,
+            "bidder_id": bidder_ids[(index + offset) % n_bidders],
+            "status": BidStatus.SUBMITTED,
+            "bid_amount": 450000.0,
+            "cover_letter": "We propose the best solution.",
+            "submitted_at": now,
+        }
+        for index, project_id in enumerate(project_ids)
+        for offset in range(n_bids_per_project)
+    ]
+    # xmax is 0 only for rows this statement inserted
+    result = await session.execute(
+        _upsert(Bid, "project_id", "bidder_id").returning(
+            Bid.project_id,
+            Bid.bidder_id,
+            Bid.id,
+            literal_column("xmax = 0"),
+        ),
+        bids,
+        execution_options=execution_options,
+    )
+    bid_rows = {
+        (project_id, bidder_id): (bid_id, inserted)
+        for project_id, bidder_id, bid_id, inserted in result.all()
+    }
+
+    # Existing bids already have their document and evaluation
+    new_bids = []
+    for bid in bids:
+        bid_id, inserted = bid_rows[bid["project_id"], bid["bidder_id"]]
+        if inserted:
+            new_bids.append((bid_id, bid))
+
+    # 4. Add a Document for each new bid
+    documents = [
+        {
+            "bid_id": bid_id,
+            "document_type": DocumentType.RFP,
+            "filename": "proposal.pdf",
+            "file_path": f"/files/{bid_id}/proposal.pdf",
+            "file_size": 1024,
+            "mime_type": "application/pdf",
+            "extracted_text": "Sample extracted text from PDF",
+            "document_metadata": {},
+            "uploaded_at": now,
+        }
+        for bid_id, _ in new_bids
+    ]
+
+    # 5. Add an Evaluation for each new bid, reviewed by the project's organization
+    evaluations = [
+        {
+            "bid_id": bid_id,
+            "technical_score": 85.0,
+            "financial_score": 90.0,
+            "compliance_score": 100.0,
+            "overall_score": 91.7,
+            "is_qualified": 1,
+            "is_shortlisted": 1,
+            "rank": 1,
+            "reviewer_notes": "Excellent bid",
+            "reviewed_by": project_orgs[bid["project_id"]],
+            "reviewed_at": now,
+            "ai_analysis": {},
+            "created_at": now,
+            "updated_at": now,
+        }
+        for bid_id, bid in new_bids
+    ]
+
+    await _insert_documents_and_evaluations(session, documents, evaluations)
+
+    for index in indexes:
+        await connection.run_sync(index.create)
+
+
+async def _insert_documents_and_evaluations(
+    session: AsyncSession,
+    documents: list,
+    evaluations: list,
+):
+    """Insert the leaf rows of new bids, one document and evaluation per bid"""
+    if not documents:
+        return  # an empty parameter list would run a single default INSERT
+
+    # Large loads COPY the leaf tables; the bids are new, so their
+    # evaluations cannot conflict
+    if len(documents) > COPY_MIN_ROWS:
+        await bulk_copy(session, Document, documents)
+        await bulk_copy(session, Evaluation, evaluations)
+        return
+
+    # Without RETURNING, asyncpg sends each list as one prepared statement
+    # executed for every row in a single pipelined batch
+    await session.execute(insert(Document), documents)
+    await session.execute(
+        pg_insert(Evaluation).on_conflict_do_nothing(index_elements=["bid_id"]),
+        evaluations,
+    )
+
+
+async def create_test_data(**counts):
+    # A pool-less engine: the script's connection is closed when released
+    engine = make_engine(for_script=True)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        # One explicit transaction for the whole seed, committed when the block exits
+        async with session_factory() as session, session.begin():
+            await seed(session, **counts)
+    finally:
+        await engine.dispose()
+
+    print("✔ Test data created successfully!")
 
-        session.add(evaluation1)
-        await session.commit()
-        print("✅ Evaluation created")
 
 if __name__ == "__main__":
-    asyncio.run(create_test_data())
-    print("🎉 Test data creation complete")
+    parser = argparse.ArgumentParser(description="Populate the database with test data")
+    parser.add_argument("--orgs", type=int, default=1)
+    parser.add_argument("--bidders", type=int, default=1)
+    parser.add_argument("--projects-per-org", type=int, default=1)
+    parser.add_argument("--bids-per-project", type=int, default=1)
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="rebuild non-unique indexes once after loading instead of per row",
+    )
+    args = parser.parse_args()
+
+    # uvloop cuts the per-await overhead of the many database round trips
+    loop_factory = uvloop.new_event_loop if uvloop else None
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(create_test_data(
+            n_orgs=args.orgs,
+            n_bidders=args.bidders,
+            n_projects_per_org=args.projects_per_org,
+            n_bids_per_project=args.bids_per_project,
+            bulk_mode=args.bulk,
+        ))
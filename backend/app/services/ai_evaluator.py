@@ -1,11 +1,86 @@
+import asyncio
+import hashlib
 import json
 import logging
-from typing import Dict, List, Any
+import re
+import time
+from datetime import timedelta
+from typing import AsyncIterator, Dict, List, Any, Optional, Set, Tuple
 import google.generativeai as genai
+import orjson
+from google.api_core.exceptions import BadRequest, GoogleAPIError
+from google.generativeai import caching
+from pydantic import TypeAdapter, ValidationError
 from app.core.config import settings
+from app.services.eval_cache import ResponseCache
+from app.services.evaluation_schemas import BidComparison, EvaluationResult, KeyInformation
 
 logger = logging.getLogger(__name__)
 
+GENERATION_CONFIG = {
+    "temperature": 0.3,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 8192,
+    # JSON mode: the model stops at the end of the object instead of
+    # wrapping it in markdown or trailing prose
+    "response_mime_type": "application/json",
+}
+
+# Token budgets for document text sent to Gemini: per document, for all
+# documents of one bid, and per document in key-information extraction
+DOCUMENT_TOKEN_LIMIT = 1500
+BID_DOCUMENTS_TOKEN_BUDGET = 12000
+EXTRACTION_TOKEN_LIMIT = 1000
+
+# Pause after a context cache creation failed for a possibly transient reason
+CACHE_RETRY_SECONDS = 60
+
+# Sentence ends and line breaks, where truncated text is preferably cut
+_SENTENCE_END_RE = re.compile(r'[.!?](?=\s)|\n')
+
+# Which KeyInformation fields to fill per document type
+KEY_INFORMATION_FIELDS = """For FINANCIAL documents: revenue, profit and assets (amount and currency), key_metrics and financial_health.
+For TECHNICAL documents: technologies, experience_years, team_size, certifications and key_capabilities.
+For OTHER document types: key_points and summary.
+Leave the fields that do not apply to the document type null."""
+
+# The SDK's schema conversion accepts the builtin list[...] generic only;
+# typing.List raises TypeError when the request is built
+_KEY_INFORMATION_LIST_SCHEMA = list[KeyInformation]
+_KEY_INFORMATION_LIST = TypeAdapter(_KEY_INFORMATION_LIST_SCHEMA)
+
+# Characters that change the nesting state while scanning for a JSON object
+_JSON_STRUCTURE_RE = re.compile(r'[{}"\\]')
+
+
+def _find_json_object_end(text: str, start: int) -> int:
+    """Return the index just past the object opening at start, or -1 if it is not closed yet"""
+    depth = 0
+    in_string = False
+    escaped_until = -1
+    for match in _JSON_STRUCTURE_RE.finditer(text, start):
+        position = match.start()
+        if position < escaped_until:
+            continue
+        char = match.group()
+        if in_string:
+            if char == "\\":
+                escaped_until = position + 2
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return position + 1
+    
+    return -1
+
+
 class AIEvaluator:
     """AI-powered bid evaluation service using Google Gemini"""
     
@@ -16,21 +91,47 @@ class AIEvaluator:
         # Initialize model
         self.model = genai.GenerativeModel(
             model_name=settings.GEMINI_MODEL,
-            generation_config={
-                "temperature": 0.3,
-                "top_p": 0.95,
-                "top_k": 40,
-                "max_output_tokens": 8192,
-            }
+            generation_config=GENERATION_CONFIG
         )
         
+        # Context caches holding the instructions + criteria of a project,
+        # keyed by criteria hash: (cached model, monotonic expiry)
+        self._caches: Dict[str, Tuple[genai.GenerativeModel, float]] = {}
+        self._uncacheable: Set[str] = set()
+        # Monotonic time before which a key whose cache creation failed
+        # transiently is not tried again
+        self._cache_retry_at: Dict[str, float] = {}
+        # One lock per key, so concurrent bids of a project create one cache
+        self._cache_locks: Dict[str, asyncio.Lock] = {}
+        
+        # Serialized criteria sections, keyed by criteria hash; a tender's
+        # criteria are the same for every one of its bids
+        self._criteria_sections: Dict[str, str] = {}
+        
+        # Token counts of document texts, keyed by content hash
+        self._token_counts: Dict[str, int] = {}
+        
+        # Parsed responses for identical inputs (re-reviews, UI refreshes)
+        self._evaluation_cache = ResponseCache("evaluate")
+        self._comparison_cache = ResponseCache("compare")
+        self._extraction_cache = ResponseCache("extract")
+        
         logger.info(f"AI Evaluator initialized with model: {settings.GEMINI_MODEL}")
     
+    async def warm_up(self):
+        """Open the connection to Gemini so the first request skips the handshake"""
+        try:
+            await self.model.count_tokens_async("ping")
+            logger.info("Gemini connection warmed up")
+        except Exception as e:
+            logger.warning(f"Gemini warm-up failed: {str(e)}")
+    
     async def evaluate_bid(
         self,
         bid_data: Dict[str, Any],
         project_criteria: Dict[str, Any],
-        documents: List[Dict[str, Any]]
+        documents: List[Dict[str, Any]],
+        common_documents: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """
         Evaluate a bid against project criteria
@@ -39,43 +140,272 @@ class AIEvaluator:
             bid_data: Basic bid information (amount, bidder details)
             project_criteria: Evaluation criteria from the project
             documents: List of extracted document contents
+            common_documents: Documents shared with other bids of the project,
+                by reference id; matching documents are sent once as references
         
         Returns:
             Evaluation results with scores and analysis
         """
+        common_documents = common_documents or {}
         try:
-            # Prepare document summaries
-            doc_summaries = self._prepare_documents(documents)
+            cache_key = self._evaluation_cache.make_key(
+                project_criteria, bid_data, documents
+            )
+            cached = await self._evaluation_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Returning cached bid evaluation")
+                return cached
             
-            # Create evaluation prompt
-            prompt = self._create_evaluation_prompt(
-                bid_data, 
-                project_criteria, 
-                doc_summaries
+            model, prompt = await self._build_evaluation_request(
+                bid_data,
+                project_criteria,
+                documents,
+                common_documents
             )
             
-            # Call Gemini API
             logger.info("Sending evaluation request to Gemini...")
-            response = self.model.generate_content(prompt)
+            chunks = [chunk async for chunk in self._stream_json(model, prompt)]
             
             # Parse response
-            evaluation_text = response.text
+            evaluation_text = "".join(chunks)
             evaluation_result = self._parse_evaluation(evaluation_text)
             
-            logger.info(f"Bid evaluation completed successfully")
+            # Parse failures come back with the raw response; retry those
+            if "raw_response" not in evaluation_result:
+                await self._evaluation_cache.set(cache_key, evaluation_result)
+            
+            logger.info("Bid evaluation completed successfully")
             return evaluation_result
             
         except Exception as e:
             logger.error(f"Error in AI evaluation: {str(e)}")
             raise
     
-    def _prepare_documents(self, documents: List[Dict[str, Any]]) -> Dict[str, str]:
+    async def stream_evaluation(
+        self,
+        bid_data: Dict[str, Any],
+        project_criteria: Dict[str, Any],
+        documents: List[Dict[str, Any]],
+        common_documents: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Evaluate a bid, yielding the evaluation JSON text as Gemini generates it
+        
+        Meant for relaying progress to the client (e.g. as server-sent events);
+        use evaluate_bid for the parsed and cached result.
+        """
+        model, prompt = await self._build_evaluation_request(
+            bid_data,
+            project_criteria,
+            documents,
+            common_documents or {}
+        )
+        async for chunk in self._stream_json(model, prompt):
+            yield chunk
+    
+    async def _build_evaluation_request(
+        self,
+        bid_data: Dict[str, Any],
+        project_criteria: Dict[str, Any],
+        documents: List[Dict[str, Any]],
+        common_documents: Dict[str, str]
+    ) -> Tuple[genai.GenerativeModel, str]:
+        """Choose the model and build the prompt for a bid evaluation"""
+        # Prepare document summaries
+        doc_summaries = await self._prepare_documents(documents, common_documents)
+        
+        # Instructions, criteria and common documents are shared by every
+        # bid of a project; send them once through a context cache when possible
+        cached_model = await self._get_cached_model(project_criteria, common_documents)
+        if cached_model:
+            return cached_model, self._create_bid_prompt(bid_data, doc_summaries)
+        
+        prompt = self._create_evaluation_prompt(
+            bid_data, 
+            project_criteria, 
+            doc_summaries,
+            common_documents
+        )
+        return self.model, prompt
+    
+    async def _stream_json(
+        self,
+        model: genai.GenerativeModel,
+        prompt: str
+    ) -> AsyncIterator[str]:
+        """
+        Stream a JSON object response, stopping as soon as the top-level
+        object closes so no trailing text is waited for
+        """
+        response = await model.generate_content_async(
+            prompt,
+            generation_config={"response_schema": EvaluationResult},
+            stream=True
+        )
+        received = []
+        async for chunk in response:
+            text = chunk.text
+            received.append(text)
+            yield text
+            
+            if "}" in text:
+                buffer = "".join(received)
+                start = buffer.find("{")
+                if start != -1 and _find_json_object_end(buffer, start) != -1:
+                    break
+    
+    async def evaluate_bids(
+        self,
+        bids: List[Dict[str, Any]],
+        project_criteria: Dict[str, Any],
+        docs_by_bid: Dict[int, List[Dict[str, Any]]],
+        max_concurrency: int = 8
+    ) -> List[Any]:
+        """
+        Evaluate several bids of a project concurrently
+        
+        Args:
+            bids: Bid information dicts, each with the bid's "id"
+            project_criteria: Evaluation criteria from the project
+            docs_by_bid: Extracted documents per bid id
+            max_concurrency: Maximum Gemini requests in flight
+        
+        Returns:
+            One result per bid, in input order; failed evaluations are
+            returned as the raised exception
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        common_documents = await self._find_common_documents(docs_by_bid)
+        
+        async def evaluate_one(bid_data: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.evaluate_bid(
+                    bid_data,
+                    project_criteria,
+                    docs_by_bid.get(bid_data["id"], []),
+                    common_documents
+                )
+        
+        return await asyncio.gather(
+            *(evaluate_one(bid_data) for bid_data in bids),
+            return_exceptions=True
+        )
+    
+    async def _get_cached_model(
+        self,
+        criteria: Dict[str, Any],
+        common_documents: Dict[str, str]
+    ) -> Optional[genai.GenerativeModel]:
+        """
+        Get a model bound to a context cache of the evaluation instructions,
+        project criteria and common documents
+        
+        Returns None when the shared prefix is below the cache minimum size
+        or caching is unavailable; callers then send the full prompt.
+        """
+        key = self._criteria_key(criteria)
+        if common_documents:
+            key += ":" + ",".join(sorted(common_documents))
+        
+        if not self._should_create_cache(key):
+            return self._live_cached_model(key)
+        
+        lock = self._cache_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another bid may have created the cache while this one waited
+            if not self._should_create_cache(key):
+                return self._live_cached_model(key)
+        
+            return await self._create_cached_model(key, criteria, common_documents)
+    
+    def _live_cached_model(self, key: str) -> Optional[genai.GenerativeModel]:
+        """Return the key's cached model unless it is (about to be) expired"""
+        entry = self._caches.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+    
+    def _should_create_cache(self, key: str) -> bool:
+        """Whether a context cache should be created for the key now"""
+        if self._live_cached_model(key) is not None or key in self._uncacheable:
+            return False
+        return self._cache_retry_at.get(key, 0) <= time.monotonic()
+    
+    async def _create_cached_model(
+        self,
+        key: str,
+        criteria: Dict[str, Any],
+        common_documents: Dict[str, str]
+    ) -> Optional[genai.GenerativeModel]:
+        """Create the context cache for a key; callers hold the key's lock"""
+        system_instruction = self._create_instructions(criteria)
+        contents = [self._create_criteria_section(criteria)]
+        if common_documents:
+            contents.append(self._create_common_documents_section(common_documents))
+        
+        try:
+            token_count = await self.model.count_tokens_async(
+                [system_instruction, *contents]
+            )
+            if token_count.total_tokens < settings.GEMINI_CACHE_MIN_TOKENS:
+                self._uncacheable.add(key)
+                return None
+            
+            ttl = settings.GEMINI_CACHE_TTL_SECONDS
+            cache = await asyncio.to_thread(
+                caching.CachedContent.create,
+                model=settings.GEMINI_MODEL,
+                system_instruction=system_instruction,
+                contents=contents,
+                ttl=timedelta(seconds=ttl)
+            )
+        except BadRequest as e:
+            # Rejected outright (content too small, model without caching):
+            # asking again will not help
+            logger.warning(f"Context caching not supported, sending full prompt: {str(e)}")
+            self._uncacheable.add(key)
+            return None
+        except Exception as e:
+            # Possibly transient; try again after a pause
+            logger.warning(f"Context caching failed, sending full prompt: {str(e)}")
+            self._cache_retry_at[key] = time.monotonic() + CACHE_RETRY_SECONDS
+            return None
+        
+        cached_model = genai.GenerativeModel.from_cached_content(
+            cached_content=cache,
+            generation_config=GENERATION_CONFIG
+        )
+        # Stop using the cache a minute before the server expires it
+        self._caches[key] = (cached_model, time.monotonic() + ttl - 60)
+        return cached_model
+    
+    async def _prepare_documents(
+        self,
+        documents: List[Dict[str, Any]],
+        common_documents: Dict[str, str]
+    ) -> Dict[str, str]:
         """Prepare document summaries for evaluation"""
         doc_summaries = {}
         
-        for doc in documents:
+        # Share the bid's budget between its documents
+        token_limit = min(
+            DOCUMENT_TOKEN_LIMIT,
+            BID_DOCUMENTS_TOKEN_BUDGET // max(len(documents), 1)
+        )
+        
+        async def prepare(text: str) -> str:
+            if common_documents:
+                ref = self._document_ref(text)
+                if ref in common_documents:
+                    return f"[SEE DOC #{ref} IN COMMON DOCUMENTS]"
+            return await self._budget_tokens(text, token_limit)
+        
+        contents = await asyncio.gather(*(
+            prepare(doc.get("extracted_text", "")) for doc in documents
+        ))
+        
+        for doc, content in zip(documents, contents):
             doc_type = doc.get("document_type", "unknown")
-            content = doc.get("extracted_text", "")[:5000]  # Limit to 5000 chars
             
             if doc_type not in doc_summaries:
                 doc_summaries[doc_type] = []
@@ -88,58 +418,100 @@ class AIEvaluator:
         
         return doc_summaries
     
+    async def _find_common_documents(
+        self,
+        docs_by_bid: Dict[int, List[Dict[str, Any]]]
+    ) -> Dict[str, str]:
+        """Find document contents submitted by more than one bid, by reference id"""
+        contents: Dict[str, str] = {}
+        bid_counts: Dict[str, int] = {}
+        
+        for documents in docs_by_bid.values():
+            refs = set()
+            for doc in documents:
+                content = doc.get("extracted_text", "")
+                if not content:
+                    continue
+                ref = self._document_ref(content)
+                contents[ref] = content
+                refs.add(ref)
+            for ref in refs:
+                bid_counts[ref] = bid_counts.get(ref, 0) + 1
+        
+        common_refs = [ref for ref, count in bid_counts.items() if count > 1]
+        budgeted = await asyncio.gather(*(
+            self._budget_tokens(contents[ref], DOCUMENT_TOKEN_LIMIT)
+            for ref in common_refs
+        ))
+        return dict(zip(common_refs, budgeted))
+    
+    @staticmethod
+    def _document_ref(content: str) -> str:
+        """Short reference id of a document's content"""
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()[:12]
+    
+    async def _budget_tokens(self, text: str, max_tokens: int) -> str:
+        """
+        Truncate text to about max_tokens Gemini tokens, preferably at the end
+        of a sentence
+        
+        Each text is counted once with count_tokens (cached by content hash)
+        and cut in proportion to its own characters-per-token ratio, which
+        varies several-fold between prose, tables and code.
+        """
+        # Every token covers at least one character
+        if len(text) <= max_tokens:
+            return text
+        
+        key = self._document_ref(text)
+        total_tokens = self._token_counts.get(key)
+        if total_tokens is None:
+            try:
+                total_tokens = (await self.model.count_tokens_async(text)).total_tokens
+            except Exception as e:
+                logger.warning(f"Token counting failed, estimating: {str(e)}")
+                total_tokens = len(text) // 4
+            self._token_counts[key] = total_tokens
+        
+        if total_tokens <= max_tokens:
+            return text
+        
+        cut = len(text) * max_tokens // total_tokens
+        # Back off to the last sentence end, unless that loses over a fifth
+        sentence_end = None
+        for match in _SENTENCE_END_RE.finditer(text, cut * 4 // 5, cut):
+            sentence_end = match.end()
+        return text[:sentence_end or cut]
+    
     def _create_evaluation_prompt(
         self,
         bid_data: Dict[str, Any],
         criteria: Dict[str, Any],
-        documents: Dict[str, str]
+        documents: Dict[str, str],
+        common_documents: Dict[str, str]
     ) -> str:
-        """Create detailed evaluation prompt for Gemini"""
+        """Create the full, uncached evaluation prompt for Gemini"""
+        parts = [
+            self._create_instructions(criteria),
+            self._create_criteria_section(criteria)
+        ]
+        if common_documents:
+            parts.append(self._create_common_documents_section(common_documents))
+        parts.append(self._create_bid_prompt(bid_data, documents))
+        return "\n\n".join(parts)
+    
+    def _create_instructions(self, criteria: Dict[str, Any]) -> str:
+        """Create the evaluation task instructions, identical for all bids of a project"""
         
-        prompt = f"""You are an expert procurement evaluator analyzing a bid submission for a tender/project. Your task is to thoroughly evaluate the bid against the specified criteria and provide detailed scoring.
-
-## PROJECT CRITERIA
-{json.dumps(criteria, indent=2)}
-
-## BID INFORMATION
-- Bidder: {bid_data.get('company_name', 'N/A')}
-- Bid Amount: {bid_data.get('bid_amount', 'N/A')} {bid_data.get('currency', 'USD')}
-- Submission Date: {bid_data.get('submitted_at', 'N/A')}
-
-## SUBMITTED DOCUMENTS
-{self._format_documents(documents)}
+        return f"""You are an expert procurement evaluator analyzing a bid submission for a tender/project. Your task is to thoroughly evaluate the bid against the specified criteria and provide detailed scoring.
 
 ## EVALUATION TASK
 
-Please evaluate this bid comprehensively and provide your analysis in the following JSON format:
-
-{{
-  "technical_evaluation": {{
-    "score": <0-100>,
-    "strengths": [<list of technical strengths>],
-    "weaknesses": [<list of technical weaknesses>],
-    "key_findings": "<detailed technical assessment>"
-  }},
-  "financial_evaluation": {{
-    "score": <0-100>,
-    "competitiveness": "<assessment of pricing>",
-    "financial_stability": "<assessment from financial docs>",
-    "key_findings": "<detailed financial assessment>"
-  }},
-  "compliance_evaluation": {{
-    "score": <0-100>,
-    "status": "pass" or "fail",
-    "missing_requirements": [<list any missing required items>],
-    "compliance_issues": [<list any compliance concerns>]
-  }},
-  "overall_assessment": {{
-    "overall_score": <weighted average based on criteria weights>,
-    "recommendation": "award" or "shortlist" or "reject",
-    "ranking_justification": "<why this bid should be ranked as it is>",
-    "risk_factors": [<list any risk factors>],
-    "summary": "<executive summary of the bid evaluation>"
-  }}
-}}
+Please evaluate the bid comprehensively:
+- Score the technical, financial and compliance aspects from 0 to 100
+- The overall score is the weighted average based on the criteria weights
+- The compliance status is "pass" or "fail"
+- The recommendation is "award", "shortlist" or "reject"
 
 IMPORTANT GUIDELINES:
 - Be objective and thorough
@@ -147,60 +519,66 @@ IMPORTANT GUIDELINES:
 - Consider the project criteria weights: Technical ({criteria.get('technical_weight', 60)}%), Financial ({criteria.get('financial_weight', 40)}%)
 - Flag any red flags or concerns
 - Provide actionable insights
-- Ensure scores are realistic and justified
+- Ensure scores are realistic and justified"""
+    
+    def _create_criteria_section(self, criteria: Dict[str, Any]) -> str:
+        """Create the project criteria section of the prompt"""
+        key = self._criteria_key(criteria)
+        section = self._criteria_sections.get(key)
+        if section is None:
+            criteria_json = orjson.dumps(criteria, option=orjson.OPT_INDENT_2).decode()
+            section = f"""## PROJECT CRITERIA
+{criteria_json}"""
+            self._criteria_sections[key] = section
+        return section
+    
+    @staticmethod
+    def _criteria_key(criteria: Dict[str, Any]) -> str:
+        """Hash project criteria independently of key order"""
+        return hashlib.sha256(
+            orjson.dumps(criteria, option=orjson.OPT_SORT_KEYS)
+        ).hexdigest()
+    
+    def _create_common_documents_section(self, common_documents: Dict[str, str]) -> str:
+        """Create the section holding documents shared by several bids"""
+        parts = ["## COMMON DOCUMENTS"]
+        for ref in sorted(common_documents):
+            parts.append(f"\n**DOC #{ref}**\n{common_documents[ref]}")
+        return "\n".join(parts)
+    
+    def _create_bid_prompt(
+        self,
+        bid_data: Dict[str, Any],
+        documents: Dict[str, str]
+    ) -> str:
+        """Create the per-bid part of the prompt"""
+        
+        return f"""## BID INFORMATION
+- Bidder: {bid_data.get('company_name', 'N/A')}
+- Bid Amount: {bid_data.get('bid_amount', 'N/A')} {bid_data.get('currency', 'USD')}
+- Submission Date: {bid_data.get('submitted_at', 'N/A')}
 
-Return ONLY the JSON object, no additional text or markdown formatting."""
+## SUBMITTED DOCUMENTS
+{self._format_documents(documents)}
 
-        return prompt
+Evaluate this bid as instructed."""
     
     def _format_documents(self, documents: Dict[str, List]) -> str:
         """Format documents for the prompt"""
-        formatted = ""
+        parts = []
         for doc_type, docs in documents.items():
-            formatted += f"\n### {doc_type.upper()} DOCUMENTS\n"
+            parts.append(f"\n### {doc_type.upper()} DOCUMENTS\n")
             for doc in docs:
-                formatted += f"\n**File: {doc['filename']}**\n"
-                formatted += f"{doc['content'][:2000]}...\n"  # Limit per doc
-        return formatted
+                parts.append(f"\n**File: {doc['filename']}**\n")
+                parts.append(f"{doc['content']}\n")
+        return "".join(parts)
     
     def _parse_evaluation(self, evaluation_text: str) -> Dict[str, Any]:
         """Parse Gemini's evaluation response"""
         try:
-            # Try to extract JSON from response
-            # Remove markdown code blocks if present
-            cleaned = evaluation_text.strip()
-            
-            # Remove markdown formatting
-            if cleaned.startswith("```json"):
-                cleaned = cleaned[7:]
-            elif cleaned.startswith("```"):
-                cleaned = cleaned[3:]
+            return EvaluationResult.model_validate_json(evaluation_text).model_dump()
             
-            if cleaned.endswith("```"):
-                cleaned = cleaned[:-3]
-            
-            # Try to find JSON in the text
-            import re
-            json_match = re.search(r'\{.*\}', cleaned, re.DOTALL)
-            if json_match:
-                cleaned = json_match.group(0)
-            
-            evaluation_data = json.loads(cleaned.strip())
-            
-            # Calculate overall score if not provided
-            if "overall_assessment" in evaluation_data:
-                if "overall_score" not in evaluation_data["overall_assessment"]:
-                    tech_score = evaluation_data.get("technical_evaluation", {}).get("score", 0)
-                    fin_score = evaluation_data.get("financial_evaluation", {}).get("score", 0)
-                    comp_score = evaluation_data.get("compliance_evaluation", {}).get("score", 0)
-                    
-                    # Weighted average (adjust weights as needed)
-                    overall = (tech_score * 0.5) + (fin_score * 0.3) + (comp_score * 0.2)
-                    evaluation_data["overall_assessment"]["overall_score"] = round(overall, 2)
-            
-            return evaluation_data
-            
-        except json.JSONDecodeError as e:
+        except ValidationError as e:
             logger.error(f"Failed to parse evaluation JSON: {str(e)}")
             logger.error(f"Raw response: {evaluation_text}")
             
@@ -228,28 +606,22 @@ Return ONLY the JSON object, no additional text or markdown formatting."""
 ## BID EVALUATIONS
 {json.dumps(evaluations, indent=2)}
 
-Provide a comparison analysis in JSON format:
-
-{{
-  "ranking": [
-    {{
-      "bid_id": <id>,
-      "rank": <1, 2, 3...>,
-      "score": <overall_score>,
-      "justification": "<why this ranking>"
-    }}
-  ],
-  "key_insights": [<list of insights from comparison>],
-  "recommendation": "<final recommendation for contract award>",
-  "value_for_money_analysis": "<which bid offers best value>"
-}}
-
-Return ONLY the JSON object, no additional text."""
+Rank every bid, justify each ranking, and give your key insights, a final recommendation for contract award and a value-for-money analysis."""
 
         try:
-            response = self.model.generate_content(prompt)
-            comparison_text = response.text
-            return self._parse_evaluation(comparison_text)
+            cache_key = self._comparison_cache.make_key(evaluations)
+            cached = await self._comparison_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            response = await self.model.generate_content_async(
+                prompt,
+                generation_config={"response_schema": BidComparison}
+            )
+            comparison = BidComparison.model_validate_json(response.text).model_dump()
+            
+            await self._comparison_cache.set(cache_key, comparison)
+            return comparison
             
         except Exception as e:
             logger.error(f"Error in bid comparison: {str(e)}")
@@ -270,63 +642,144 @@ Return ONLY the JSON object, no additional text."""
         Returns:
             Dictionary with extracted key information
         """
-        
-        prompt = f"""Extract key information from this {document_type} document.
+        try:
+            cache_key = self._extraction_cache.make_key(
+                document_type,
+                hashlib.sha256(document_text.encode()).hexdigest()
+            )
+            cached = await self._extraction_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            # Budgeting calls count_tokens, so only do it on a cache miss
+            document_excerpt = await self._budget_tokens(document_text, EXTRACTION_TOKEN_LIMIT)
+            prompt = f"""Extract key information from this {document_type} document.
 
 DOCUMENT TEXT:
-{document_text[:4000]}
-
-Please extract and structure the following information as JSON:
-
-For FINANCIAL documents:
-{{
-  "revenue": "<amount and currency>",
-  "profit": "<amount and currency>",
-  "assets": "<amount and currency>",
-  "key_metrics": [<list of important financial metrics>],
-  "financial_health": "<brief assessment>"
-}}
-
-For TECHNICAL documents:
-{{
-  "technologies": [<list of technologies mentioned>],
-  "experience_years": "<years of experience>",
-  "team_size": "<number of team members>",
-  "certifications": [<list of certifications>],
-  "key_capabilities": [<list of capabilities>]
-}}
-
-For OTHER document types:
-{{
-  "key_points": [<list of important points>],
-  "summary": "<brief summary>"
-}}
-
-Return ONLY the JSON object."""
+{document_excerpt}
 
-        try:
-            response = self.model.generate_content(prompt)
-            result_text = response.text
-            
-            # Parse JSON response
-            cleaned = result_text.strip()
-            if cleaned.startswith("```json"):
-                cleaned = cleaned[7:]
-            elif cleaned.startswith("```"):
-                cleaned = cleaned[3:]
-            if cleaned.endswith("```"):
-                cleaned = cleaned[:-3]
-            
-            import re
-            json_match = re.search(r'\{.*\}', cleaned, re.DOTALL)
-            if json_match:
-                cleaned = json_match.group(0)
+Fill in the fields for its document type:
+
+{KEY_INFORMATION_FIELDS}"""
             
-            return json.loads(cleaned.strip())
+            response = await self.model.generate_content_async(
+                prompt,
+                generation_config={"response_schema": KeyInformation}
+            )
+            extracted = KeyInformation.model_validate_json(response.text).model_dump(exclude_none=True)
+            await self._extraction_cache.set(cache_key, extracted)
+            return extracted
             
         except Exception as e:
             logger.error(f"Error extracting information: {str(e)}")
             return {
                 "error": str(e),
                 "summary": "Could not extract structured information"
-            }
\ No newline at end of file
+            }
+    
+    async def extract_key_information_batch(
+        self,
+        documents: List[Tuple[str, str]],
+        batch_size: int = 8
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract key information from several documents, one Gemini call per batch
+        
+        Args:
+            documents: (document_text, document_type) pairs
+            batch_size: Documents per request, small enough for the combined
+                answer to fit in max_output_tokens
+        
+        Returns:
+            One result per document, in input order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(documents)
+        cache_keys = [
+            self._extraction_cache.make_key(
+                document_type,
+                hashlib.sha256(document_text.encode()).hexdigest()
+            )
+            for document_text, document_type in documents
+        ]
+        
+        pending = []
+        for index, cache_key in enumerate(cache_keys):
+            results[index] = await self._extraction_cache.get(cache_key)
+            if results[index] is None:
+                pending.append(index)
+        
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        batch_results = await asyncio.gather(*(
+            self._extract_key_information_batch([documents[i] for i in batch])
+            for batch in batches
+        ))
+        
+        for batch, extracted in zip(batches, batch_results):
+            for index, result in zip(batch, extracted):
+                results[index] = result
+                if "error" not in result:
+                    await self._extraction_cache.set(cache_keys[index], result)
+        
+        return results
+    
+    async def _extract_key_information_batch(
+        self,
+        documents: List[Tuple[str, str]]
+    ) -> List[Dict[str, Any]]:
+        """Extract key information from one batch with a single merged prompt"""
+        if len(documents) == 1:
+            return [await self.extract_key_information(*documents[0])]
+        
+        excerpts = await asyncio.gather(*(
+            self._budget_tokens(document_text, EXTRACTION_TOKEN_LIMIT)
+            for document_text, _ in documents
+        ))
+        sections = "\n\n".join(
+            f"## DOCUMENT {number} (type={document_type})\n{excerpt}"
+            for number, (excerpt, (_, document_type)) in enumerate(zip(excerpts, documents), 1)
+        )
+        
+        prompt = f"""Extract key information from the following {len(documents)} documents.
+
+{sections}
+
+For each document, fill in the fields for its document type:
+
+{KEY_INFORMATION_FIELDS}
+
+Return an array of length {len(documents)}, one object per document, in document order."""
+
+        try:
+            response = await self.model.generate_content_async(
+                prompt,
+                generation_config={"response_schema": _KEY_INFORMATION_LIST_SCHEMA}
+            )
+            results = _KEY_INFORMATION_LIST.validate_json(response.text)
+            
+            if len(results) == len(documents):
+                return [result.model_dump(exclude_none=True) for result in results]
+            
+            logger.warning("Batched extraction returned the wrong number of results, extracting individually")
+        
+        # Only API failures, blocked or empty responses (response.text raises
+        # ValueError) and parse failures (a ValidationError is a ValueError)
+        # fall back; anything else is a bug in the request and must not hide
+        # behind N single calls
+        except (GoogleAPIError, ValueError) as e:
+            logger.warning(f"Batched extraction failed, extracting individually: {str(e)}")
+        
+        return list(await asyncio.gather(*(
+            self.extract_key_information(document_text, document_type)
+            for document_text, document_type in documents
+        )))
+
+
+_evaluator: Optional[AIEvaluator] = None
+
+
+def get_evaluator() -> AIEvaluator:
+    """Return the process-wide evaluator, creating it on first use"""
+    global _evaluator
+    if _evaluator is None:
+        _evaluator = AIEvaluator()
+    return _evaluator
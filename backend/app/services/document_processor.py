@@ -1,201 +1,263 @@
+import asyncio
 import io
 import logging
-from typing import Optional
+import math
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, Union
 import PyPDF2
+import ahocorasick
+import pypdfium2 as pdfium
 import docx
-import pandas as pd
 from openpyxl import load_workbook
 
 logger = logging.getLogger(__name__)
 
+# Files at least this large are parsed in the process pool
+PROCESS_POOL_MIN_SIZE = 200 * 1024
+# Text beyond this is never used downstream (evaluation prompts and stored
+# documents keep at most the first few thousand characters)
+DEFAULT_MAX_CHARS = 20000
+
+# Common financial keywords
+FINANCIAL_KEYWORDS = [
+    "revenue", "profit", "loss", "assets", "liabilities",
+    "turnover", "balance", "equity", "cash flow", "budget"
+]
+
+# Common technology keywords
+TECH_KEYWORDS = [
+    "python", "java", "javascript", "react", "angular", "vue",
+    "docker", "kubernetes", "aws", "azure", "gcp",
+    "microservices", "api", "database", "postgresql", "mongodb",
+    "machine learning", "ai", "devops", "ci/cd"
+]
+
+# Certification keywords
+CERT_KEYWORDS = [
+    "iso", "cmmi", "pci", "hipaa", "soc 2", "gdpr",
+    "certified", "certification", "accreditation"
+]
+
+def _build_keyword_automaton() -> ahocorasick.Automaton:
+    """
+    Build one Aho-Corasick automaton over all keyword lists, reporting every
+    (overlapping) occurrence as (category, keyword)
+    """
+    automaton = ahocorasick.Automaton()
+    for category, keywords in (
+        ("financial", FINANCIAL_KEYWORDS),
+        ("technology", TECH_KEYWORDS),
+        ("certification", CERT_KEYWORDS),
+    ):
+        for keyword in keywords:
+            automaton.add_word(keyword, (category, keyword))
+    automaton.make_automaton()
+    return automaton
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+# Experience phrases, currency codes and numeric values in one pass;
+# experience comes first so its year count is not taken as a number
+_METADATA_RE = re.compile(
+    r'(?P<experience>(?P<years>\d+)\s*(?:years?|yrs?)\s*(?:of\s*)?(?:experience|exp\.?))'
+    r'|(?P<currency>\b(?:USD|EUR|GBP|PKR|INR|CNY|JPY)\b)'
+    r'|(?P<number>[\$£€₹]\s*[\d,]+\.?\d*|\b\d{1,3}(?:,\d{3})*(?:\.\d+)?\s*(?:million|billion|thousand|k|m|b)?)',
+    re.IGNORECASE
+)
+
+_WORKER_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# PDFium is not thread-safe; small files are parsed on the thread pool, so
+# every call into it in a process goes through this lock
+_PDFIUM_LOCK = threading.Lock()
+
+# File content, or the path of a file on disk
+DocumentSource = Union[bytes, str]
+
+class DocumentExtractionError(Exception):
+    """Text could not be extracted from a document; the message says why"""
+
 class DocumentProcessor:
     """Service for extracting text from various document formats"""
     
-    async def extract_text(self, file_content: bytes, file_extension: str) -> str:
+    def __init__(self):
+        # Parsing is CPU-bound pure Python; worker processes are started lazily.
+        # By then the server runs gRPC and event loop threads, and forking a
+        # process with threads can deadlock the child, so workers are started
+        # from a clean forkserver (spawn where that is unavailable)
+        self._process_pool = self._new_process_pool()
+    
+    @staticmethod
+    def _new_process_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context(_WORKER_START_METHOD)
+        )
+    
+    def shutdown(self):
+        """Stop the worker processes, cancelling parses that have not started"""
+        self._process_pool.shutdown(wait=True, cancel_futures=True)
+    
+    async def extract_text(
+        self,
+        source: DocumentSource,
+        file_extension: str,
+        max_chars: int = DEFAULT_MAX_CHARS
+    ) -> str:
         """
         Extract text from document based on file type
         
         Args:
-            file_content: Binary content of the file
+            source: Binary content of the file, or its path; large files are
+                best passed by path so parsers read them from disk
             file_extension: File extension (e.g., '.pdf', '.docx')
+            max_chars: Stop parsing once this much text has been extracted
         
         Returns:
-            Extracted text content
+            Extracted text content, at most max_chars long
+        
+        Raises:
+            DocumentExtractionError: If the document could not be parsed
         """
+        extractor = _EXTRACTORS.get(file_extension)
+        if extractor is None:
+            logger.warning(f"Unsupported file extension: {file_extension}")
+            return ""
+        
         try:
-            if file_extension == '.pdf':
-                return await self._extract_from_pdf(file_content)
-            elif file_extension in ['.docx', '.doc']:
-                return await self._extract_from_docx(file_content)
-            elif file_extension in ['.xlsx', '.xls']:
-                return await self._extract_from_excel(file_content)
-            else:
-                logger.warning(f"Unsupported file extension: {file_extension}")
-                return ""
+            return await self._run_blocking(extractor, source, max_chars)
+        
+        except DocumentExtractionError:
+            raise
         
         except Exception as e:
             logger.error(f"Error extracting text from {file_extension}: {str(e)}")
-            return f"Error extracting text: {str(e)}"
+            raise DocumentExtractionError(f"Error extracting text: {str(e)}") from e
     
-    async def _extract_from_pdf(self, file_content: bytes) -> str:
-        """Extract text from PDF file"""
-        try:
-            pdf_file = io.BytesIO(file_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            text_parts = []
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text = page.extract_text()
-                if text:
-                    text_parts.append(f"--- Page {page_num + 1} ---\n{text}")
-            
-            extracted_text = "\n\n".join(text_parts)
-            logger.info(f"Extracted {len(extracted_text)} characters from PDF")
-            return extracted_text
+    def extract_text_sync(
+        self,
+        source: DocumentSource,
+        file_extension: str,
+        max_chars: int = DEFAULT_MAX_CHARS
+    ) -> str:
+        """
+        Extract text in the calling thread
+        
+        For callers that are already off the event loop (plain `def` routes,
+        worker threads); a single document gains nothing from an executor hop.
+        Same arguments, result and errors as extract_text.
+        """
+        extractor = _EXTRACTORS.get(file_extension)
+        if extractor is None:
+            logger.warning(f"Unsupported file extension: {file_extension}")
+            return ""
         
-        except Exception as e:
-            logger.error(f"PDF extraction error: {str(e)}")
-            return f"Error reading PDF: {str(e)}"
-    
-    async def _extract_from_docx(self, file_content: bytes) -> str:
-        """Extract text from Word document"""
         try:
-            doc_file = io.BytesIO(file_content)
-            doc = docx.Document(doc_file)
-            
-            text_parts = []
-            
-            # Extract paragraphs
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_parts.append(paragraph.text)
-            
-            # Extract tables
-            for table in doc.tables:
-                table_text = []
-                for row in table.rows:
-                    row_text = " | ".join(cell.text.strip() for cell in row.cells)
-                    table_text.append(row_text)
-                
-                if table_text:
-                    text_parts.append("\n[TABLE]\n" + "\n".join(table_text) + "\n[/TABLE]")
-            
-            extracted_text = "\n\n".join(text_parts)
-            logger.info(f"Extracted {len(extracted_text)} characters from DOCX")
-            return extracted_text
+            return extractor(source, max_chars)
+        
+        except DocumentExtractionError:
+            raise
         
         except Exception as e:
-            logger.error(f"DOCX extraction error: {str(e)}")
-            return f"Error reading Word document: {str(e)}"
+            logger.error(f"Error extracting text from {file_extension}: {str(e)}")
+            raise DocumentExtractionError(f"Error extracting text: {str(e)}") from e
     
-    async def _extract_from_excel(self, file_content: bytes) -> str:
-        """Extract text from Excel file"""
-        try:
-            excel_file = io.BytesIO(file_content)
-            
-            # Try with pandas first (works for both xls and xlsx)
-            try:
-                # Read all sheets
-                excel_data = pd.read_excel(excel_file, sheet_name=None)
-                
-                text_parts = []
-                for sheet_name, df in excel_data.items():
-                    text_parts.append(f"--- Sheet: {sheet_name} ---")
-                    
-                    # Convert dataframe to readable text
-                    # Include column headers and first 100 rows
-                    df_sample = df.head(100)
-                    text_parts.append(df_sample.to_string(index=False))
-                    
-                    # Add summary statistics for numeric columns
-                    numeric_cols = df.select_dtypes(include=['number']).columns
-                    if len(numeric_cols) > 0:
-                        text_parts.append("\n[SUMMARY STATISTICS]")
-                        text_parts.append(df[numeric_cols].describe().to_string())
-                
-                extracted_text = "\n\n".join(text_parts)
-                logger.info(f"Extracted {len(extracted_text)} characters from Excel")
-                return extracted_text
-            
-            except Exception as e:
-                logger.error(f"Pandas Excel extraction failed: {str(e)}")
-                
-                # Fallback to openpyxl for xlsx
-                try:
-                    excel_file.seek(0)
-                    wb = load_workbook(excel_file, read_only=True, data_only=True)
-                    
-                    text_parts = []
-                    for sheet_name in wb.sheetnames:
-                        sheet = wb[sheet_name]
-                        text_parts.append(f"--- Sheet: {sheet_name} ---")
-                        
-                        # Read first 100 rows
-                        for row_idx, row in enumerate(sheet.iter_rows(max_row=100, values_only=True)):
-                            if any(cell is not None for cell in row):
-                                row_text = " | ".join(str(cell) if cell is not None else "" for cell in row)
-                                text_parts.append(row_text)
-                            
-                            if row_idx >= 100:
-                                break
-                    
-                    extracted_text = "\n".join(text_parts)
-                    logger.info(f"Extracted {len(extracted_text)} characters from Excel (openpyxl)")
-                    return extracted_text
-                
-                except Exception as openpyxl_error:
-                    logger.error(f"OpenPyXL Excel extraction also failed: {str(openpyxl_error)}")
-                    return f"Error reading Excel file: {str(openpyxl_error)}"
+    async def _run_blocking(
+        self,
+        extractor: Callable[[DocumentSource, int], str],
+        source: DocumentSource,
+        max_chars: int
+    ) -> str:
+        """
+        Run a blocking extractor off the event loop
         
-        except Exception as e:
-            logger.error(f"Excel extraction error: {str(e)}")
-            return f"Error reading Excel file: {str(e)}"
+        Small files go to the default thread pool, which avoids pickling the
+        content; larger ones to the process pool so parsing runs on all cores
+        instead of contending for the GIL.
+        """
+        size = len(source) if isinstance(source, bytes) else os.path.getsize(source)
+        loop = asyncio.get_running_loop()
+        if size < PROCESS_POOL_MIN_SIZE:
+            return await loop.run_in_executor(None, extractor, source, max_chars)
+        
+        # A worker that dies (OOM, a parser crash) takes the pool with it;
+        # replace the pool, unless a concurrent job already has, and retry once
+        for attempt in range(2):
+            pool = self._process_pool
+            try:
+                return await loop.run_in_executor(pool, extractor, source, max_chars)
+            except BrokenProcessPool:
+                logger.warning("Document process pool broke, starting a new one")
+                if self._process_pool is pool:
+                    self._process_pool = self._new_process_pool()
+                    pool.shutdown(wait=False, cancel_futures=True)
+                if attempt:
+                    raise
     
-    async def extract_financial_data(self, text: str) -> dict:
+    async def extract_metadata(self, text: str) -> dict:
         """
-        Extract structured financial data from text
+        Extract financial data and technical capabilities from text
+        
+        Both are gathered with a single keyword scan and a single regex scan.
         
         Args:
-            text: Extracted text from financial documents
+            text: Extracted text from the document
         
         Returns:
-            Dictionary with extracted financial metrics
+            Dictionary with "financial" and "technical" sections
         """
         # This is a simplified version
         # In production, you'd use more sophisticated NLP or regex patterns
         
-        financial_data = {
-            "currency_mentions": [],
-            "numeric_values": [],
-            "keywords_found": []
-        }
+        # One automaton pass finds every keyword of every category
+        hits = {"financial": set(), "technology": set(), "certification": set()}
+        for _, (category, keyword) in _KEYWORD_AUTOMATON.iter(text.lower()):
+            hits[category].add(keyword)
         
-        # Common financial keywords
-        keywords = [
-            "revenue", "profit", "loss", "assets", "liabilities",
-            "turnover", "balance", "equity", "cash flow", "budget"
-        ]
-        
-        text_lower = text.lower()
-        
-        for keyword in keywords:
-            if keyword in text_lower:
-                financial_data["keywords_found"].append(keyword)
+        # Currency mentions (USD, EUR, GBP, PKR, etc.), numeric values with
+        # currency symbols or magnitude words, and experience indicators
+        currencies = set()
+        numbers = []
+        experiences = []
+        for match in _METADATA_RE.finditer(text):
+            if match.lastgroup == "currency":
+                currencies.add(match.group())
+            elif match.lastgroup == "number":
+                numbers.append(match.group())
+            else:
+                experiences.append(f"{match.group('years')} years")
         
-        # Extract currency mentions (USD, EUR, GBP, PKR, etc.)
-        import re
-        currency_pattern = r'\b(USD|EUR|GBP|PKR|INR|CNY|JPY)\b'
-        currencies = re.findall(currency_pattern, text, re.IGNORECASE)
-        financial_data["currency_mentions"] = list(set(currencies))
+        return {
+            "financial": {
+                "currency_mentions": list(currencies),
+                "numeric_values": numbers[:20],  # First 20 numbers
+                "keywords_found": [kw for kw in FINANCIAL_KEYWORDS if kw in hits["financial"]]
+            },
+            "technical": {
+                "technologies_mentioned": [kw for kw in TECH_KEYWORDS if kw in hits["technology"]],
+                "certifications": [kw for kw in CERT_KEYWORDS if kw in hits["certification"]],
+                "experience_indicators": experiences
+            }
+        }
+    
+    async def extract_financial_data(self, text: str) -> dict:
+        """
+        Extract structured financial data from text
         
-        # Extract numeric values with currency symbols or keywords
-        # Pattern for numbers with optional commas and decimals
-        number_pattern = r'[\$£€₹]\s*[\d,]+\.?\d*|\b\d{1,3}(?:,\d{3})*(?:\.\d+)?\s*(?:million|billion|thousand|k|m|b)?'
-        numbers = re.findall(number_pattern, text, re.IGNORECASE)
-        financial_data["numeric_values"] = numbers[:20]  # First 20 numbers
+        Args:
+            text: Extracted text from financial documents
         
-        return financial_data
+        Returns:
+            Dictionary with extracted financial metrics
+        """
+        return (await self.extract_metadata(text))["financial"]
     
     async def extract_technical_capabilities(self, text: str) -> dict:
         """
@@ -207,41 +269,243 @@ class DocumentProcessor:
         Returns:
             Dictionary with technical information
         """
-        technical_data = {
-            "technologies_mentioned": [],
-            "certifications": [],
-            "experience_indicators": []
-        }
+        return (await self.extract_metadata(text))["technical"]
+
+# Extractors run in executor workers, so they live at module level (picklable)
+
+def _as_file(source: DocumentSource):
+    """Wrap content in a file object; paths are passed to parsers as is"""
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+def _extract_pdf_text(source: DocumentSource, max_chars: int) -> str:
+    """Extract text from PDF file"""
+    try:
+        with _PDFIUM_LOCK:
+            # Files given by path are memory-mapped rather than read into memory
+            pdf = pdfium.PdfDocument(source)
+            
+            try:
+                text_parts = []
+                total_chars = 0
+                for page_num, page in enumerate(pdf):
+                    # Close pages as we go to cap memory on large documents
+                    textpage = page.get_textpage()
+                    text = textpage.get_text_bounded()
+                    textpage.close()
+                    page.close()
+                    if text.strip():
+                        text_parts.append(f"--- Page {page_num + 1} ---\n{text}")
+                        total_chars += len(text_parts[-1])
+                        if total_chars >= max_chars:
+                            break
+            finally:
+                pdf.close()
+        
+        extracted_text = "\n\n".join(text_parts)[:max_chars]
+        logger.info(f"Extracted {len(extracted_text)} characters from PDF")
+        return extracted_text
+    
+    except Exception as e:
+        logger.warning(f"PDFium extraction failed, falling back to PyPDF2: {str(e)}")
+        return _extract_pdf_text_pypdf2(source, max_chars)
+
+def _extract_pdf_text_pypdf2(source: DocumentSource, max_chars: int) -> str:
+    """Extract text from PDF file with PyPDF2, which tolerates some malformed files"""
+    try:
+        pdf_reader = PyPDF2.PdfReader(_as_file(source))
+        
+        text_parts = []
+        total_chars = 0
+        for page_num in range(len(pdf_reader.pages)):
+            page = pdf_reader.pages[page_num]
+            text = page.extract_text()
+            if text:
+                text_parts.append(f"--- Page {page_num + 1} ---\n{text}")
+                total_chars += len(text_parts[-1])
+                if total_chars >= max_chars:
+                    break
+        
+        extracted_text = "\n\n".join(text_parts)[:max_chars]
+        logger.info(f"Extracted {len(extracted_text)} characters from PDF")
+        return extracted_text
+    
+    except Exception as e:
+        logger.error(f"PDF extraction error: {str(e)}")
+        raise DocumentExtractionError(f"Error reading PDF: {str(e)}") from e
+
+def _extract_docx_text(source: DocumentSource, max_chars: int) -> str:
+    """Extract text from Word document"""
+    try:
+        doc = docx.Document(_as_file(source))
+        
+        # Write straight into one buffer instead of building per-row and
+        # per-table strings to join
+        buffer = io.StringIO()
+        write = buffer.write
+        
+        # Extract paragraphs
+        for paragraph in doc.paragraphs:
+            text = paragraph.text
+            if text and not text.isspace():
+                write(text)
+                write("\n\n")
+                if buffer.tell() >= max_chars:
+                    break
+        
+        # Extract tables
+        for table in doc.tables:
+            if buffer.tell() >= max_chars:
+                break
+            
+            write("\n[TABLE]\n")
+            for row in table.rows:
+                # Horizontally merged cells appear once per grid column
+                seen = set()
+                separator = ""
+                for cell in row.cells:
+                    if cell._tc in seen:
+                        continue
+                    seen.add(cell._tc)
+                    write(separator)
+                    write(cell.text.strip())
+                    separator = " | "
+                write("\n")
+                if buffer.tell() >= max_chars:
+                    break
+            write("[/TABLE]\n\n")
+        
+        extracted_text = buffer.getvalue().rstrip()[:max_chars]
+        logger.info(f"Extracted {len(extracted_text)} characters from DOCX")
+        return extracted_text
+    
+    except Exception as e:
+        logger.error(f"DOCX extraction error: {str(e)}")
+        raise DocumentExtractionError(f"Error reading Word document: {str(e)}") from e
+
+def _extract_excel_text(source: DocumentSource, max_chars: int) -> str:
+    """Extract text from Excel file"""
+    try:
+        wb = load_workbook(_as_file(source), read_only=True, data_only=True)
+    except Exception as e:
+        # Legacy .xls (BIFF) workbooks are not readable by openpyxl
+        logger.info(f"OpenPyXL could not open workbook, trying pandas: {str(e)}")
+        return _extract_excel_text_pandas(source, max_chars)
+    
+    try:
+        text_parts = []
+        total_chars = 0
+        for sheet in wb.worksheets:
+            if total_chars >= max_chars:
+                break
+            
+            text_parts.append(f"--- Sheet: {sheet.title} ---")
+            
+            # Stream rows: the first 100 become text, the rest only feed the
+            # summary statistics of numeric columns
+            header = None
+            stats = {}
+            non_numeric = set()
+            for row_idx, row in enumerate(sheet.iter_rows(values_only=True)):
+                if header is None:
+                    header = [str(cell) if cell is not None else f"Column {i + 1}" for i, cell in enumerate(row)]
+                
+                if row_idx < 100 and total_chars < max_chars and any(cell is not None for cell in row):
+                    row_text = " | ".join(str(cell) if cell is not None else "" for cell in row)
+                    text_parts.append(row_text)
+                    total_chars += len(row_text)
+                
+                if row_idx == 0:
+                    continue
+                
+                for col, cell in enumerate(row):
+                    if cell is None or col in non_numeric:
+                        continue
+                    if isinstance(cell, bool) or not isinstance(cell, (int, float)):
+                        non_numeric.add(col)
+                        stats.pop(col, None)
+                        continue
+                    _update_stats(stats.setdefault(col, [0, 0.0, 0.0, cell, cell]), cell)
+            
+            if stats:
+                text_parts.append("\n[SUMMARY STATISTICS]")
+                for col, (count, mean, m2, low, high) in sorted(stats.items()):
+                    name = header[col] if header and col < len(header) else f"Column {col + 1}"
+                    std = math.sqrt(m2 / (count - 1)) if count > 1 else float("nan")
+                    text_parts.append(
+                        f"{name}: count={count} mean={mean:.6g} std={std:.6g} min={low:.6g} max={high:.6g}"
+                    )
+        
+        extracted_text = "\n".join(text_parts)[:max_chars]
+        logger.info(f"Extracted {len(extracted_text)} characters from Excel")
+        return extracted_text
+    
+    except Exception as e:
+        logger.error(f"Excel extraction error: {str(e)}")
+        raise DocumentExtractionError(f"Error reading Excel file: {str(e)}") from e
+    
+    finally:
+        wb.close()
+
+def _update_stats(stats: list, value: float):
+    """Fold a value into [count, mean, M2, min, max] (Welford's algorithm)"""
+    stats[0] += 1
+    delta = value - stats[1]
+    stats[1] += delta / stats[0]
+    stats[2] += delta * (value - stats[1])
+    stats[3] = min(stats[3], value)
+    stats[4] = max(stats[4], value)
+
+def _extract_excel_text_pandas(source: DocumentSource, max_chars: int) -> str:
+    """Extract text from legacy Excel files via pandas (needs xlrd for .xls)"""
+    # Imported here so pandas stays off the common .xlsx path
+    import pandas as pd
+    
+    try:
+        excel_data = pd.read_excel(_as_file(source), sheet_name=None)
+        
+        text_parts = []
+        total_chars = 0
+        for sheet_name, df in excel_data.items():
+            if total_chars >= max_chars:
+                break
+            
+            text_parts.append(f"--- Sheet: {sheet_name} ---")
+            
+            # Include column headers and first 100 rows
+            text_parts.append(df.head(100).to_string(index=False))
+            
+            # Add summary statistics for numeric columns
+            numeric_cols = df.select_dtypes(include=['number']).columns
+            if len(numeric_cols) > 0:
+                text_parts.append("\n[SUMMARY STATISTICS]")
+                text_parts.append(df[numeric_cols].describe().to_string())
+            
+            total_chars = sum(len(part) for part in text_parts)
         
-        # Common technology keywords
-        tech_keywords = [
-            "python", "java", "javascript", "react", "angular", "vue",
-            "docker", "kubernetes", "aws", "azure", "gcp",
-            "microservices", "api", "database", "postgresql", "mongodb",
-            "machine learning", "ai", "devops", "ci/cd"
-        ]
-        
-        # Certification keywords
-        cert_keywords = [
-            "iso", "cmmi", "pci", "hipaa", "soc 2", "gdpr",
-            "certified", "certification", "accreditation"
-        ]
-        
-        text_lower = text.lower()
-        
-        for tech in tech_keywords:
-            if tech in text_lower:
-                technical_data["technologies_mentioned"].append(tech)
-        
-        for cert in cert_keywords:
-            if cert in text_lower:
-                technical_data["certifications"].append(cert)
-        
-        # Look for experience indicators
-        import re
-        experience_pattern = r'(\d+)\s*(?:years?|yrs?)\s*(?:of\s*)?(?:experience|exp\.?)'
-        experiences = re.findall(experience_pattern, text_lower)
-        if experiences:
-            technical_data["experience_indicators"] = [f"{exp} years" for exp in experiences]
-        
-        return technical_data
\ No newline at end of file
+        extracted_text = "\n\n".join(text_parts)[:max_chars]
+        logger.info(f"Extracted {len(extracted_text)} characters from Excel (pandas)")
+        return extracted_text
+    
+    except Exception as e:
+        logger.error(f"Excel extraction error: {str(e)}")
+        raise DocumentExtractionError(f"Error reading Excel file: {str(e)}") from e
+
+
+# Text extractor per file extension
+_EXTRACTORS = {
+    '.pdf': _extract_pdf_text,
+    '.docx': _extract_docx_text,
+    '.doc': _extract_docx_text,
+    '.xlsx': _extract_excel_text,
+    '.xls': _extract_excel_text,
+}
+
+_document_processor: Optional[DocumentProcessor] = None
+
+
+def get_document_processor() -> DocumentProcessor:
+    """Return the process-wide document processor, creating it on first use"""
+    global _document_processor
+    if _document_processor is None:
+        _document_processor = DocumentProcessor()
+    return _document_processor
@@ -0,0 +1,44 @@
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from redis.exceptions import RedisError
+
+from app.core.cache import redis_client
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Exact-match cache of parsed Gemini responses, stored in Redis"""
+    
+    def __init__(self, namespace: str, ttl: int = settings.LLM_RESPONSE_CACHE_TTL):
+        self.namespace = namespace
+        self.ttl = ttl
+    
+    def make_key(self, *parts: Any) -> str:
+        """Build a cache key from the JSON-serializable inputs of a call"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+            digest.update(b"\0")
+        # Responses of one model are not reused for another
+        return f"cache:llm:{settings.GEMINI_MODEL}:{self.namespace}:{digest.hexdigest()}"
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response, or None on a miss or Redis error"""
+        try:
+            cached = await redis_client.get(key)
+        except RedisError as e:
+            logger.warning(f"Response cache read failed: {str(e)}")
+            return None
+        return json.loads(cached) if cached is not None else None
+    
+    async def set(self, key: str, value: Dict[str, Any]):
+        """Store a response; failures are logged and otherwise ignored"""
+        try:
+            await redis_client.setex(key, self.ttl, json.dumps(value, default=str))
+        except RedisError as e:
+            logger.warning(f"Response cache write failed: {str(e)}")
@@ -0,0 +1,80 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Dict, List, Optional
+
+# Response schemas passed to Gemini's structured-output mode; the model is
+# constrained to produce JSON matching them, so no format goes in the prompt
+
+
+class TechnicalEvaluation(BaseModel):
+    score: float
+    strengths: List[str]
+    weaknesses: List[str]
+    key_findings: str
+
+
+class FinancialEvaluation(BaseModel):
+    score: float
+    competitiveness: str
+    financial_stability: str
+    key_findings: str
+
+
+class ComplianceEvaluation(BaseModel):
+    score: float
+    status: str
+    missing_requirements: List[str]
+    compliance_issues: List[str]
+
+
+class OverallAssessment(BaseModel):
+    overall_score: float
+    recommendation: str
+    ranking_justification: str
+    risk_factors: List[str]
+    summary: str
+
+
+class EvaluationResult(BaseModel):
+    technical_evaluation: TechnicalEvaluation
+    financial_evaluation: FinancialEvaluation
+    compliance_evaluation: ComplianceEvaluation
+    overall_assessment: OverallAssessment
+
+
+class BidRanking(BaseModel):
+    bid_id: int
+    rank: int
+    score: float
+    justification: str
+
+
+class BidComparison(BaseModel):
+    ranking: List[BidRanking]
+    key_insights: List[str]
+    recommendation: str
+    value_for_money_analysis: str
+
+
+def _drop_defaults(schema: Dict[str, Any]) -> None:
+    """Remove "default" from property schemas; Gemini's Schema has no such field"""
+    for prop in schema.get("properties", {}).values():
+        prop.pop("default", None)
+
+
+class KeyInformation(BaseModel):
+    # Which fields apply depends on the document type; the rest are null.
+    # Gemini may also leave them out, as the SDK marks no field required.
+    model_config = ConfigDict(json_schema_extra=_drop_defaults)
+
+    revenue: Optional[str] = None
+    profit: Optional[str] = None
+    assets: Optional[str] = None
+    key_metrics: Optional[List[str]] = None
+    financial_health: Optional[str] = None
+    technologies: Optional[List[str]] = None
+    experience_years: Optional[str] = None
+    team_size: Optional[str] = None
+    certifications: Optional[List[str]] = None
+    key_capabilities: Optional[List[str]] = None
+    key_points: Optional[List[str]] = None
+    summary: Optional[str] = None
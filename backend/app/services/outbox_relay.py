@@ -0,0 +1,82 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import redis_client
+from app.db.database import AsyncSessionLocal
+from app.db.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+# Redis list consumed by app.workers.evaluation_worker
+EVALUATION_QUEUE = "queue:evaluations"
+
+
+class OutboxRelay:
+    """Moves committed outbox events onto the Redis work queue"""
+    
+    def __init__(self, batch_size: int = 100, poll_interval: float = 1.0):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+    
+    async def relay_pending(self, session: AsyncSession) -> int:
+        """
+        Dispatch one batch of unprocessed events
+        
+        Rows are locked with SKIP LOCKED so several relays can run side by
+        side. An event is marked processed only after it was pushed, so a
+        crash in between re-delivers it (at-least-once).
+        
+        Returns:
+            Number of events dispatched
+        """
+        result = await session.execute(
+            select(OutboxEvent)
+            .where(OutboxEvent.processed_at.is_(None))
+            .order_by(OutboxEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        events = result.scalars().all()
+        
+        if not events:
+            return 0
+        
+        await redis_client.rpush(
+            EVALUATION_QUEUE,
+            *(
+                json.dumps({"type": event.event_type, **event.payload})
+                for event in events
+            )
+        )
+        
+        now = datetime.utcnow()
+        for event in events:
+            event.processed_at = now
+        
+        await session.commit()
+        return len(events)
+    
+    async def run(self):
+        """Relay events until cancelled"""
+        logger.info("Outbox relay started")
+        while True:
+            try:
+                async with AsyncSessionLocal() as session:
+                    dispatched = await self.relay_pending(session)
+            except Exception as e:
+                logger.error(f"Outbox relay error: {str(e)}")
+                dispatched = 0
+            
+            # Drain backlogs without pausing; idle otherwise
+            if dispatched < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(OutboxRelay().run())
@@ -0,0 +1,204 @@
+import asyncio
+import json
+import logging
+import socket
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.core.cache import redis_client
+from app.db.database import AsyncSessionLocal
+from app.db import models
+from app.services.ai_evaluator import get_evaluator
+from app.services.outbox_relay import EVALUATION_QUEUE, OutboxRelay
+
+logger = logging.getLogger(__name__)
+
+
+async def evaluate_submitted_bid(session: AsyncSession, bid_id: int) -> bool:
+    """
+    Evaluate a submitted bid with Gemini and store the result
+    
+    Safe to call again for the same bid (events are delivered at least
+    once): a bid that already has an evaluation is left alone.
+    
+    Returns:
+        True if an evaluation was stored
+    """
+    result = await session.execute(
+        select(models.Bid)
+        .options(
+            joinedload(models.Bid.project),
+            joinedload(models.Bid.bidder),
+            joinedload(models.Bid.evaluation),
+            selectinload(models.Bid.documents)
+        )
+        .where(models.Bid.id == bid_id)
+    )
+    bid = result.unique().scalar_one_or_none()
+    
+    if bid is None:
+        logger.warning(f"Bid {bid_id} no longer exists, skipping evaluation")
+        return False
+    if bid.evaluation is not None:
+        return False
+    
+    bid_data = {
+        "id": bid.id,
+        "company_name": bid.bidder.company_name,
+        "bid_amount": bid.bid_amount,
+        "currency": bid.currency,
+        "submitted_at": bid.submitted_at.isoformat() if bid.submitted_at else None
+    }
+    documents = [
+        {
+            "filename": document.filename,
+            "document_type": document.document_type.value,
+            "extracted_text": document.extracted_text or "",
+            "metadata": document.document_metadata or {}
+        }
+        for document in bid.documents
+    ]
+    criteria = bid.project.evaluation_criteria or {}
+    
+    # Do not keep the read transaction open during the Gemini call
+    await session.commit()
+    
+    evaluation = await get_evaluator().evaluate_bid(bid_data, criteria, documents)
+    if "raw_response" in evaluation:
+        raise ValueError(f"Unparseable evaluation response for bid {bid_id}")
+    
+    # A concurrent delivery of the same event may have stored one meanwhile
+    stored = await session.scalar(
+        pg_insert(models.Evaluation)
+        .values(
+            bid_id=bid_id,
+            technical_score=evaluation["technical_evaluation"]["score"],
+            financial_score=evaluation["financial_evaluation"]["score"],
+            compliance_score=evaluation["compliance_evaluation"]["score"],
+            overall_score=evaluation["overall_assessment"]["overall_score"],
+            is_qualified=int(evaluation["compliance_evaluation"]["status"] == "pass"),
+            ai_analysis=evaluation
+        )
+        .on_conflict_do_nothing(index_elements=["bid_id"])
+        .returning(models.Evaluation.id)
+    )
+    
+    if stored is not None:
+        await session.execute(
+            update(models.Bid)
+            .where(
+                models.Bid.id == bid_id,
+                models.Bid.status == models.BidStatus.SUBMITTED
+            )
+            .values(status=models.BidStatus.EVALUATED)
+        )
+    
+    await session.commit()
+    return stored is not None
+
+
+class EvaluationWorker:
+    """Evaluates the bids queued on the evaluation queue by the outbox relay"""
+    
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        max_attempts: int = 3,
+        poll_timeout: float = 5.0,
+        retry_interval: float = 1.0
+    ):
+        # Messages being worked on are parked here until done, so a crash
+        # does not lose them; the id must be stable across restarts
+        self.processing_queue = f"{EVALUATION_QUEUE}:processing:{worker_id or socket.gethostname()}"
+        self.max_attempts = max_attempts
+        self.poll_timeout = poll_timeout
+        self.retry_interval = retry_interval
+    
+    async def recover(self) -> int:
+        """
+        Put messages left in this worker's processing list by a crash back
+        at the head of the queue
+        
+        Returns:
+            Number of messages recovered
+        """
+        recovered = 0
+        while await redis_client.lmove(self.processing_queue, EVALUATION_QUEUE, "RIGHT", "LEFT"):
+            recovered += 1
+        return recovered
+    
+    async def process(self, message: str):
+        """Handle one queued event"""
+        event = json.loads(message)
+        if event.get("type") != "bid.submitted":
+            logger.warning(f"Ignoring unknown event type: {event.get('type')}")
+            return
+        
+        async with AsyncSessionLocal() as session:
+            if await evaluate_submitted_bid(session, event["bid_id"]):
+                logger.info(f"Evaluated bid {event['bid_id']}")
+    
+    async def run(self):
+        """Evaluate queued bids until cancelled"""
+        while True:
+            try:
+                recovered = await self.recover()
+                break
+            except Exception as e:
+                logger.error(f"Evaluation worker cannot reach Redis: {str(e)}")
+                await asyncio.sleep(self.retry_interval)
+
+        logger.info(f"Evaluation worker started, {recovered} message(s) recovered")
+        while True:
+            try:
+                message = await redis_client.blmove(
+                    EVALUATION_QUEUE, self.processing_queue, self.poll_timeout, "LEFT", "RIGHT"
+                )
+                if message is None:
+                    continue
+                
+                try:
+                    await self.process(message)
+                    retry = None
+                except Exception as e:
+                    logger.error(f"Evaluation failed for {message}: {str(e)}")
+                    retry = self._next_attempt(message)
+                
+                # Re-queue (if retrying) and acknowledge atomically
+                async with redis_client.pipeline(transaction=True) as pipe:
+                    if retry is not None:
+                        pipe.rpush(EVALUATION_QUEUE, retry)
+                    pipe.lrem(self.processing_queue, 1, message)
+                    await pipe.execute()
+            except Exception as e:
+                logger.error(f"Evaluation worker error: {str(e)}")
+                await asyncio.sleep(self.retry_interval)
+    
+    def _next_attempt(self, message: str) -> Optional[str]:
+        """The message to re-queue after a failure, or None to give up on it"""
+        try:
+            event = json.loads(message)
+        except ValueError:
+            logger.error(f"Dropping malformed evaluation message: {message}")
+            return None
+        
+        attempts = event.get("attempts", 0) + 1
+        if attempts >= self.max_attempts:
+            logger.error(f"Giving up on {event.get('type')} event after {attempts} attempts: {message}")
+            return None
+        
+        return json.dumps({**event, "attempts": attempts})
+
+
+async def main():
+    """Run the outbox relay and the evaluation worker side by side"""
+    await asyncio.gather(OutboxRelay().run(), EvaluationWorker().run())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+import asyncio
+import os
+import uuid
+
+import asyncpg
+import pytest
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.db.database import Base
+from app.db import models  # noqa: F401  (registers the tables on Base.metadata)
+
+
+@pytest.fixture(scope="session")
+def postgres_url(tmp_path_factory):
+    """
+    URL of a PostgreSQL server the tests may create databases on
+
+    TEST_DATABASE_URL points at an existing server (e.g. the docker-compose
+    one); otherwise a temporary cluster is started with pgserver.
+    """
+    url = os.getenv("TEST_DATABASE_URL")
+    if url:
+        yield url
+        return
+
+    pgserver = pytest.importorskip("pgserver")
+    server = pgserver.get_server(tmp_path_factory.mktemp("pgdata"), cleanup_mode="stop")
+    yield server.get_uri()
+
+
+@pytest.fixture
+def database_url(postgres_url):
+    """asyncpg URL of a fresh, empty database, dropped after the test"""
+    server_url = make_url(postgres_url)
+    name = f"test_{uuid.uuid4().hex}"
+
+    async def admin(statement: str):
+        connection = await asyncpg.connect(
+            server_url.set(drivername="postgresql").render_as_string(hide_password=False)
+        )
+        try:
+            await connection.execute(statement)
+        finally:
+            await connection.close()
+
+    asyncio.run(admin(f'CREATE DATABASE "{name}"'))
+    try:
+        yield server_url.set(drivername="postgresql+asyncpg", database=name)
+    finally:
+        asyncio.run(admin(f'DROP DATABASE "{name}"'))
+
+
+@pytest.fixture
+def session_factory(database_url):
+    """
+    Session factory on a fresh database with all tables
+
+    The engine keeps no connections between uses, so tests may use the
+    factory from any number of asyncio.run calls.
+    """
+    engine = create_async_engine(database_url, poolclass=NullPool)
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    try:
+        asyncio.run(create_tables())
+        yield async_sessionmaker(engine, expire_on_commit=False)
+    finally:
+        asyncio.run(engine.dispose())
@@ -0,0 +1,109 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from app.db.models import Bid, Document, Evaluation, Project, ProjectStatus, User, UserRole
+from app.scripts import create_test_data
+
+
+def run_seed(session_factory, *runs):
+    """Seed once per keyword set in runs, each in its own transaction"""
+
+    async def seed_and_count():
+        for counts in runs:
+            async with session_factory() as session, session.begin():
+                await create_test_data.seed(session, **counts)
+
+        async with session_factory() as session:
+            counted = {
+                model: await session.scalar(select(func.count()).select_from(model))
+                for model in (User, Project, Bid, Document, Evaluation)
+            }
+            # Every foreign key must land on a row of the right kind
+            mismatched = await session.scalar(
+                select(func.count())
+                .select_from(Evaluation)
+                .join(Bid, Bid.id == Evaluation.bid_id)
+                .join(Project, Project.id == Bid.project_id)
+                .join(User, User.id == Bid.bidder_id)
+                .where(
+                    (User.role != UserRole.BIDDER)
+                    | (Evaluation.reviewed_by != Project.organization_id)
+                )
+            )
+            connection = await session.connection()
+            index_names = await connection.run_sync(
+                lambda conn: {
+                    index["name"]
+                    for table in ("projects", "bids", "documents")
+                    for index in conn.dialect.get_indexes(conn, table)
+                }
+            )
+        return counted, mismatched, index_names
+
+    return asyncio.run(seed_and_count())
+
+
+def test_create_test_data_seed(session_factory):
+    counted, mismatched, _ = run_seed(
+        session_factory,
+        dict(n_orgs=2, n_bidders=3, n_projects_per_org=2, n_bids_per_project=2),
+    )
+
+    assert counted == {User: 5, Project: 4, Bid: 8, Document: 8, Evaluation: 8}
+    assert mismatched == 0
+
+    async def count_open_projects():
+        async with session_factory() as session:
+            return await session.scalar(
+                select(func.count())
+                .select_from(Project)
+                .where(
+                    Project.status == ProjectStatus.ACTIVE,
+                    Project.deadline > datetime.utcnow(),
+                    Project.budget_range_max.is_not(None),
+                )
+            )
+
+    # Bidders can see and bid on every seeded project
+    assert asyncio.run(count_open_projects()) == 4
+
+
+def test_create_test_data_rerun_adds_only_missing_rows(session_factory):
+    counted, mismatched, _ = run_seed(
+        session_factory,
+        dict(n_orgs=1, n_bidders=2, n_projects_per_org=2, n_bids_per_project=2),
+        dict(n_orgs=3, n_bidders=3, n_projects_per_org=2, n_bids_per_project=3),
+        dict(n_orgs=3, n_bidders=3, n_projects_per_org=2, n_bids_per_project=3),
+    )
+
+    assert counted == {User: 6, Project: 6, Bid: 18, Document: 18, Evaluation: 18}
+    assert mismatched == 0
+
+
+def test_create_test_data_rerun_keeps_project_organizations(session_factory):
+    # The second run assigns RFQ-002 to the first organization and bids on
+    # it again; the project stays with the second, and so must the new
+    # evaluation's reviewer
+    counted, mismatched, _ = run_seed(
+        session_factory,
+        dict(n_orgs=2, n_bidders=2, n_projects_per_org=1, n_bids_per_project=1),
+        dict(n_orgs=2, n_bidders=2, n_projects_per_org=2, n_bids_per_project=2),
+    )
+
+    assert counted[Evaluation] == 8
+    assert mismatched == 0
+
+
+def test_create_test_data_bulk_copy(session_factory):
+    # Enough bids for the COPY path, with the indexes rebuilt afterwards
+    n_bids = create_test_data.COPY_MIN_ROWS + 1
+    counted, mismatched, index_names = run_seed(
+        session_factory,
+        dict(n_orgs=1, n_bidders=1, n_projects_per_org=n_bids, bulk_mode=True),
+    )
+
+    assert counted[Document] == counted[Evaluation] == n_bids
+    assert mismatched == 0
+    assert {"ix_project_status_deadline", "ix_bid_bidder_created", "ix_document_bid"} <= index_names
@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.db import models
+from app.workers import evaluation_worker
+
+EVALUATION = {
+    "technical_evaluation": {"score": 80.0, "strengths": [], "weaknesses": [], "key_findings": ""},
+    "financial_evaluation": {"score": 70.0, "competitiveness": "", "financial_stability": "", "key_findings": ""},
+    "compliance_evaluation": {"score": 90.0, "status": "pass", "missing_requirements": [], "compliance_issues": []},
+    "overall_assessment": {
+        "overall_score": 77.0,
+        "recommendation": "shortlist",
+        "ranking_justification": "",
+        "risk_factors": [],
+        "summary": ""
+    }
+}
+
+
+class FakeEvaluator:
+    """Stands in for the Gemini evaluator, recording what it was asked"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def evaluate_bid(self, bid_data, project_criteria, documents):
+        self.calls.append((bid_data, project_criteria, documents))
+        return EVALUATION
+
+
+def test_evaluate_submitted_bid_stores_evaluation_once(session_factory, monkeypatch):
+    evaluator = FakeEvaluator()
+    monkeypatch.setattr(evaluation_worker, "get_evaluator", lambda: evaluator)
+
+    async def submit_and_evaluate_twice():
+        async with session_factory() as session:
+            bidder = models.User(
+                email="bidder@example.com",
+                hashed_password="hashed",
+                role=models.UserRole.BIDDER,
+                company_name="Bidder Co"
+            )
+            bid = models.Bid(
+                project=models.Project(
+                    organization=bidder,
+                    title="Project",
+                    deadline=datetime.utcnow(),
+                    evaluation_criteria={"technical_weight": 70}
+                ),
+                bidder=bidder,
+                status=models.BidStatus.SUBMITTED,
+                bid_amount=1000.0
+            )
+            session.add(models.Document(
+                bid=bid,
+                document_type=models.DocumentType.TECHNICAL,
+                filename="approach.pdf",
+                file_path="bids/1/technical/approach.pdf",
+                extracted_text="Our approach"
+            ))
+            await session.commit()
+            bid_id = bid.id
+
+        # The second call stands for a re-delivered event
+        stored = []
+        for _ in range(2):
+            async with session_factory() as session:
+                stored.append(await evaluation_worker.evaluate_submitted_bid(session, bid_id))
+
+        async with session_factory() as session:
+            evaluation = await session.scalar(select(models.Evaluation))
+            status = await session.scalar(select(models.Bid.status))
+        return stored, evaluation, status
+
+    stored, evaluation, status = asyncio.run(submit_and_evaluate_twice())
+
+    assert stored == [True, False]
+    assert len(evaluator.calls) == 1
+    bid_data, criteria, documents = evaluator.calls[0]
+    assert bid_data["company_name"] == "Bidder Co"
+    assert criteria == {"technical_weight": 70}
+    assert [document["extracted_text"] for document in documents] == ["Our approach"]
+
+    assert evaluation.overall_score == 77.0
+    assert evaluation.is_qualified == 1
+    assert evaluation.ai_analysis == EVALUATION
+    assert status == models.BidStatus.EVALUATED
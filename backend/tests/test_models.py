@@ -0,0 +1,52 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.db import models
+
+
+def test_document_metadata_round_trip(session_factory):
+    async def store_and_read_back():
+        async with session_factory() as session:
+            bidder = models.User(
+                email="bidder@example.com",
+                hashed_password="hashed",
+                role=models.UserRole.BIDDER,
+            )
+            project = models.Project(
+                organization=bidder,
+                title="Project",
+                deadline=datetime.utcnow(),
+            )
+            bid = models.Bid(project=project, bidder=bidder)
+            # As upload_bid_document stores it, and with the column default
+            session.add_all([
+                models.Document(
+                    bid=bid,
+                    document_type=models.DocumentType.FINANCIAL,
+                    filename="accounts.pdf",
+                    file_path="bids/1/financial/accounts.pdf",
+                    document_metadata={"sha256": "ab12"},
+                ),
+                models.Document(
+                    bid=bid,
+                    document_type=models.DocumentType.TECHNICAL,
+                    filename="approach.docx",
+                    file_path="bids/1/technical/approach.docx",
+                ),
+            ])
+            await session.commit()
+
+        # A new session, so the values come from the database rather
+        # than the identity map
+        async with session_factory() as session:
+            result = await session.execute(
+                select(models.Document.filename, models.Document.document_metadata)
+            )
+            return dict(result.all())
+
+    assert asyncio.run(store_and_read_back()) == {
+        "accounts.pdf": {"sha256": "ab12"},
+        "approach.docx": {},
+    }